@@ -1,7 +1,9 @@
-import requests
+import http_client
+import ticker_resolver
+import website_index
+import wikipedia_client
 from bs4 import BeautifulSoup
 import tldextract
-import fitz  # PyMuPDF
 import io
 import re
 from urllib.parse import urljoin, urlparse
@@ -9,23 +11,47 @@ import os
 import feedparser
 import urllib.parse
 from graphviz import Digraph
-import asyncio
-from crawl4ai import AsyncWebCrawler
-import matplotlib.pyplot as plt
+import chart_service
+import crawl_frontier
+import html_extract
+import leadership_extract
+import market_store
+import politeness
+from page_dedupe import dedupe_texts
+from pdf_parser import extract_text
 import collections
-import matplotlib
-matplotlib.use('Agg')
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
 # --- CONFIG ---
 MAX_INTERNAL_PAGES = 100  # Safety limit for full crawl
-PDF_MAX_PAGES = 10
+PDF_MAX_PAGES = 10  # pages read from each PDF found while crawling
 GNEWS_API_KEY = os.getenv('GNEWS_API_KEY')
+# Per-source deadlines (seconds) for run_advanced_crawler, measured from the start of the fan-out.
+# Sources that miss their deadline are left out of the aggregated context.
+SOURCE_DEADLINES = {
+    'internal_pages': float(os.getenv('CRAWL_DEADLINE', 60)),
+    'news': 15,
+    'leadership': 20,
+    'wikipedia': 10,
+    'yahoo_summary': 15,
+    'yahoo_trends': 30,
+}
+# Hosts the polygon and alpha_vantage SDKs talk to; their calls take a politeness slot here (yfinance goes through market_store)
+POLYGON_API = 'https://api.polygon.io'
+ALPHA_VANTAGE_API = 'https://www.alphavantage.co'
 
 # --- 1. Company Name to Website (DuckDuckGo, no API key) ---
 def resolve_company_website_duckduckgo(company_name):
+    # Local lookup in the persistent resolution index; DuckDuckGo is only scraped on a miss
+    return website_index.resolve(company_name, search_company_website_duckduckgo)
+
+def search_company_website_duckduckgo(company_name):
     import urllib.parse
     q = f"{company_name} official site"
-    resp = requests.get(f"https://duckduckgo.com/html/?q={urllib.parse.quote(q)}")
+    resp = http_client.get(f"https://duckduckgo.com/html/?q={urllib.parse.quote(q)}", cache=True)
     soup = BeautifulSoup(resp.text, "html.parser")
     results = soup.find_all('a', {'class': 'result__a'}, href=True)
     if results:
@@ -46,30 +72,29 @@ def resolve_company_website_duckduckgo(company_name):
 # Use crawl4ai for robust, AI-friendly, full-site crawling
 
 def crawl_internal_pages(base_url):
-    async def crawl():
-        async with AsyncWebCrawler() as crawler:
-            # Crawl all internal pages up to max_pages, no subpage filtering
-            results = await crawler.arun(url=base_url, max_pages=MAX_INTERNAL_PAGES, follow_external_links=False)
-            texts = []
-            pdf_texts = []
-            pages = getattr(results, 'content', None) or getattr(results, 'data', None)
-            if pages:
-                for page in pages:
-                    url = getattr(page, 'url', None)
-                    text = getattr(page, 'text', '') or ""
-                    if text:
-                        texts.append({'url': url, 'text': text})
-                    if url and url.lower().endswith('.pdf'):
-                        pdf_texts.append(text)
-            else:
-                text = getattr(results, 'markdown', '')
-                if text:
-                    texts.append({'url': base_url, 'text': text})
-            print(f"[crawl4ai] Crawled {len(texts)} pages. Example URLs:")
-            for t in texts[:5]:
-                print(f"  {t['url']} (chars: {len(t['text'])})")
-            return texts, pdf_texts
-    return asyncio.run(crawl())
+    # Best-first crawl on the shared browser pool: the most relevant pages are fetched first and the
+    # crawl stops on the frontier's time/text budget rather than after MAX_INTERNAL_PAGES pages.
+    # Incremental: pages unchanged since the last crawl of this site are served from crawl_state.
+    crawl = crawl_frontier.crawl_site(base_url, pdf_fetcher=fetch_pdf_text, incremental=True)
+    texts = [{'url': p['url'], 'text': p['text']} for p in crawl['pages']]
+    pdf_texts = crawl['pdf_texts']
+    stats = crawl['stats']
+    print(f"[crawl_frontier] Crawled {len(texts)} pages, {len(pdf_texts)} PDFs ({stats['chars']} chars in {stats['elapsed']}s, {stats['unvisited']} candidates left). "
+          f"Reused {stats['reused']} stored pages, rendered {stats['new']} new, {stats['changed']} changed and {stats['unchanged']} unchanged. "
+          f"Dropped {stats['duplicate_pages']} near-duplicate pages and skipped {stats['duplicate_urls']} duplicate URLs. Top URLs:")
+    for t in texts[:5]:
+        print(f"  {t['url']} (chars: {len(t['text'])})")
+    return texts, pdf_texts
+
+def refresh_company_site(base_url):
+    """Incrementally recrawl a company site; returns the URLs of pages that are new or changed since the last crawl."""
+    crawl = crawl_frontier.crawl_site(base_url, incremental=True)
+    stats = crawl['stats']
+    logging.info(f"[crawl_frontier] Refreshed {base_url}: {stats['reused'] + stats['unchanged']} unchanged, "
+                 f"{stats['new']} new, {stats['changed']} changed, {stats['backfilled']} reached for the first time")
+    if not stats['reused'] and not stats['changed'] and not stats['unchanged'] and not stats['backfilled']:
+        return []  # first crawl of this site: no page was stored before, so nothing counts as an update
+    return crawl['changed_urls']
 
 def is_internal_link(link, domain):
     parsed = urlparse(link)
@@ -78,31 +103,23 @@ def is_internal_link(link, domain):
 def is_relevant_subpage(url):
     return any(x in url.lower() for x in ["/about", "/leadership", "/investor", "/product", "/news", "/team", "/management"])
 
-def extract_main_text(soup):
-    # Remove nav, footer, scripts, styles
-    for tag in soup(["nav", "footer", "script", "style", "aside", "form"]):
-        tag.decompose()
-    text = soup.get_text(separator="\n", strip=True)
-    # Clean up excessive whitespace
-    text = re.sub(r"\n\s*\n", "\n\n", text)
-    return text[:5000]  # Limit per page
+def extract_main_text(html):
+    # Page text without nav, footer, scripts, styles; limit per page
+    return html_extract.main_text(html, limit=5000)
 
-def extract_pdf_text(pdf_bytes):
+def fetch_pdf_text(url):
+    resp = http_client.get(url, timeout=15, cache=True)
+    if resp.status_code != 200:
+        return ""
     try:
-        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-        text = ""
-        for i, page in enumerate(doc):
-            if i >= PDF_MAX_PAGES:
-                break
-            text += page.get_text()
-        return text[:5000]
+        return extract_text(resp.content, max_pages=PDF_MAX_PAGES, max_chars=crawl_frontier.PAGE_TEXT_LIMIT)
     except Exception:
         return ""
 
 # --- 3. News Fetching (GNews API, fallback to Google News RSS) ---
 def fetch_gnews(company_name):
     url = f'https://gnews.io/api/v4/search?q={urllib.parse.quote(company_name)}&lang=en&token={GNEWS_API_KEY}'
-    resp = requests.get(url)
+    resp = http_client.get(url)
     data = resp.json()
     news = []
     for article in data.get('articles', [])[:5]:
@@ -117,7 +134,7 @@ def fetch_gnews(company_name):
 def fetch_google_news(company_name):
     q = urllib.parse.quote(company_name)
     url = f'https://news.google.com/rss/search?q={q}'
-    feed = feedparser.parse(url)
+    feed = feedparser.parse(http_client.get(url, timeout=10, cache=True).content)
     news = []
     for entry in feed.entries[:5]:
         news.append({
@@ -139,100 +156,16 @@ def fetch_linkedin_leadership(company_name):
     ]
 
 def extract_leadership_from_website(website_url):
-    """Crawl About/Leadership/Management/IR pages and extract names/roles."""
-    import re
-    from urllib.parse import urljoin
-    import requests
-    from bs4 import BeautifulSoup
+    """Crawl About/Leadership/Management/IR pages and extract names/roles (memoized per domain)."""
     try:
-        resp = requests.get(website_url, timeout=10)
-        soup = BeautifulSoup(resp.text, "html.parser")
-        # Find links to likely leadership pages
-        leadership_links = []
-        for a in soup.find_all('a', href=True):
-            href = a['href'].lower()
-            if any(x in href for x in ["leadership", "management", "team", "about", "executive", "board", "ir", "investor"]):
-                full_url = href if href.startswith('http') else urljoin(website_url, href)
-                leadership_links.append(full_url)
-        # Deduplicate
-        leadership_links = list(set(leadership_links))
-        # Try each page for names/roles
-        leadership = []
-        for link in leadership_links[:3]:  # Limit to 3 pages
-            try:
-                page = requests.get(link, timeout=10)
-                psoup = BeautifulSoup(page.text, "html.parser")
-                # Look for patterns: Name (Role), or Role: Name, or cards with both
-                for tag in psoup.find_all(['p', 'li', 'div', 'span', 'h2', 'h3', 'h4']):
-                    text = tag.get_text(" ", strip=True)
-                    # Simple regex: Name, Role
-                    m = re.match(r"([A-Z][a-zA-Z .'-]+)[,\-–]+\s*([A-Z][a-zA-Z &]+)", text)
-                    if m:
-                        name, role = m.group(1).strip(), m.group(2).strip()
-                        if len(name.split()) >= 2 and len(role) > 2:
-                            leadership.append({"name": name, "role": role})
-                    # Role: Name
-                    m2 = re.match(r"([A-Z][a-zA-Z &]+)[:\-]+\s*([A-Z][a-zA-Z .'-]+)", text)
-                    if m2:
-                        role, name = m2.group(1).strip(), m2.group(2).strip()
-                        if len(name.split()) >= 2 and len(role) > 2:
-                            leadership.append({"name": name, "role": role})
-            except Exception:
-                continue
-        # Deduplicate by name+role
-        seen = set()
-        unique_leadership = []
-        for l in leadership:
-            key = (l['name'].lower(), l['role'].lower())
-            if key not in seen:
-                unique_leadership.append(l)
-                seen.add(key)
-        return unique_leadership
-    except Exception:
+        return leadership_extract.extract(website_url)
+    except Exception as e:
+        logging.info(f"[advanced_crawler] Leadership extraction failed for {website_url}: {e}")
         return []
 
 def fetch_wikipedia_leadership(company_name):
-    import requests
-    # Step 1: Search for the company page
-    search_url = f"https://en.wikipedia.org/w/api.php"
-    params = {
-        "action": "query",
-        "list": "search",
-        "srsearch": company_name,
-        "format": "json"
-    }
-    resp = requests.get(search_url, params=params)
-    data = resp.json()
-    if not data["query"]["search"]:
-        return []
-    page_title = data["query"]["search"][0]["title"]
-    # Step 2: Get the infobox from the page HTML
-    page_url = f"https://en.wikipedia.org/wiki/{page_title.replace(' ', '_')}"
-    resp = requests.get(page_url)
-    if resp.status_code != 200:
-        return []
-    from bs4 import BeautifulSoup
-    soup = BeautifulSoup(resp.text, "html.parser")
-    infobox = soup.find('table', {'class': 'infobox'})
-    leadership = []
-    if infobox:
-        for row in infobox.find_all('tr'):
-            header = row.find('th')
-            if header and any(x in header.text.lower() for x in ['key people', 'ceo', 'chairman', 'founder', 'president', 'cfo', 'cto', 'coo']):
-                cell = row.find('td')
-                if cell:
-                    # Split by <br> or ; or ,
-                    for part in cell.stripped_strings:
-                        # Try to split role and name
-                        if ':' in part:
-                            role, name = part.split(':', 1)
-                            leadership.append({"name": name.strip(), "role": role.strip()})
-                        elif '-' in part:
-                            role, name = part.split('-', 1)
-                            leadership.append({"name": name.strip(), "role": role.strip()})
-                        else:
-                            leadership.append({"name": part.strip(), "role": header.text.strip()})
-    return leadership
+    # Infobox key people, from the same cached article lookup as the summary
+    return wikipedia_client.leadership(company_name)
 
 def extract_leadership_with_gemini(content, company_name):
     """
@@ -281,45 +214,24 @@ Content:
 # Update fetch_leadership_info to use SerpAPI as the final fallback
 
 def fetch_leadership_info(company_name, website):
-    # No SerpAPI fallback, just return empty or use other methods if needed
-    return []
+    # No SerpAPI fallback; the company website is the only source, and only with LEADERSHIP_FROM_WEBSITE=1
+    if not leadership_extract.LEADERSHIP_FROM_WEBSITE or not website:
+        return []
+    return extract_leadership_from_website(website)
 
 def fetch_wikipedia_summary(company_name):
-    import requests
-    # Step 1: Search for the company page
-    search_url = f"https://en.wikipedia.org/w/api.php"
-    params = {
-        "action": "query",
-        "list": "search",
-        "srsearch": company_name,
-        "format": "json"
-    }
-    resp = requests.get(search_url, params=params)
-    data = resp.json()
-    if not data["query"]["search"]:
-        return ""
-    page_title = data["query"]["search"][0]["title"]
-    # Step 2: Get the summary and first section
-    summary_url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{page_title.replace(' ', '_')}"
-    resp = requests.get(summary_url)
-    if resp.status_code != 200:
-        return ""
-    data = resp.json()
-    extract = data.get("extract", "")
-    return extract
+    # Intro of the company's article; title resolution and page data are cached per title by wikipedia_client
+    return wikipedia_client.summary(company_name)
 
 def fetch_yahoo_finance_summary(company_name):
-    # Try to resolve ticker using Yahoo Finance search
-    search_url = f'https://query2.finance.yahoo.com/v1/finance/search?q={company_name}'
+    # Shared resolver: static map, learned cache, then a single Yahoo search
+    ticker = ticker_resolver.resolve(company_name)
+    if not ticker:
+        return ""
     try:
-        resp = requests.get(search_url, timeout=10)
-        data = resp.json()
-        if not data.get('quotes'):
-            return ""
-        ticker = data['quotes'][0]['symbol']
         # Fetch summary page
         summary_url = f'https://finance.yahoo.com/quote/{ticker}/profile'
-        page = requests.get(summary_url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=10)
+        page = http_client.get(summary_url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=10, cache=True)
         soup = BeautifulSoup(page.text, 'html.parser')
         # Business summary
         summary = ""
@@ -335,7 +247,7 @@ def fetch_yahoo_finance_summary(company_name):
             sector = industry = ""
         # Market cap (from summary page)
         stats_url = f'https://finance.yahoo.com/quote/{ticker}/key-statistics'
-        stats_page = requests.get(stats_url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=10)
+        stats_page = http_client.get(stats_url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=10, cache=True)
         stats_soup = BeautifulSoup(stats_page.text, 'html.parser')
         market_cap = ""
         try:
@@ -355,9 +267,7 @@ def fetch_yahoo_finance_summary(company_name):
         return ""
 
 def generate_financial_charts_slack(ticker):
-    import yfinance as yf
-    yf_ticker = yf.Ticker(ticker)
-    fin = yf_ticker.financials
+    fin = market_store.get_financials(ticker)
     if fin.empty:
         return []
     # Revenue and Net Income for last 3 years
@@ -366,47 +276,22 @@ def generate_financial_charts_slack(ticker):
     # Revenue
     if 'Total Revenue' in fin.index:
         rev = fin.loc['Total Revenue', years] / 1e9  # Billions
-        plt.figure(figsize=(4,3))
-        plt.bar(years, rev, color='#4682B4')
-        plt.title('Revenue (USD Billions)')
-        plt.ylabel('USD Billions')
-        plt.tight_layout()
-        rev_path = f'downloads/{ticker}_revenue.png'
-        plt.savefig(rev_path)
-        plt.close()
-        charts.append(rev_path)
+        charts.append(chart_service.render_to_file(
+            f'downloads/{ticker}_revenue.png', 'bar', years, rev,
+            figsize=(4, 3), color='#4682B4', title='Revenue (USD Billions)', ylabel='USD Billions'))
     # Net Income
     if 'Net Income' in fin.index:
         ni = fin.loc['Net Income', years] / 1e9
-        plt.figure(figsize=(4,3))
-        plt.bar(years, ni, color='#2E8B57')
-        plt.title('Net Income (USD Billions)')
-        plt.ylabel('USD Billions')
-        plt.tight_layout()
-        ni_path = f'downloads/{ticker}_netincome.png'
-        plt.savefig(ni_path)
-        plt.close()
-        charts.append(ni_path)
+        charts.append(chart_service.render_to_file(
+            f'downloads/{ticker}_netincome.png', 'bar', years, ni,
+            figsize=(4, 3), color='#2E8B57', title='Net Income (USD Billions)', ylabel='USD Billions'))
     return charts
 
 # Refactor fetch_yahoo_finance_trends to return chart paths as well
 
 def fetch_yahoo_finance_trends(company_name, website_url=None, internal_texts=None, pdf_texts=None):
-    from company_ticker_map import get_ticker
     import os
-    ticker = get_ticker(company_name)
-    if ticker is None:
-        # fallback to yfinance logic as before
-        try:
-            import yfinance as yf
-            search_url = f'https://query2.finance.yahoo.com/v1/finance/search?q={company_name}'
-            resp = requests.get(search_url, timeout=10)
-            data = resp.json()
-            if not data.get('quotes'):
-                raise Exception('No ticker found')
-            ticker = data['quotes'][0]['symbol']
-        except Exception:
-            ticker = None
+    ticker = ticker_resolver.resolve(company_name)
     # Detect if US ticker (no .NS, .BO, .L, .TO, etc.)
     is_us = ticker and ('.' not in ticker or ticker.endswith('.N') or ticker.endswith('.O') or ticker.endswith('.A') or ticker.endswith('.K') or ticker.endswith('.M') or ticker.endswith('.P') or ticker.endswith('.Q') or ticker.endswith('.V') or ticker.endswith('.X') or ticker.endswith('.Y') or ticker.endswith('.Z') or ticker.endswith('.B') or ticker.endswith('.C') or ticker.endswith('.D') or ticker.endswith('.E') or ticker.endswith('.F') or ticker.endswith('.G') or ticker.endswith('.H') or ticker.endswith('.I') or ticker.endswith('.J') or ticker.endswith('.L') or ticker.endswith('.R') or ticker.endswith('.S') or ticker.endswith('.T') or ticker.endswith('.U') or ticker.endswith('.W'))
     is_india = ticker and (ticker.endswith('.NS') or ticker.endswith('.BO'))
@@ -416,7 +301,8 @@ def fetch_yahoo_finance_trends(company_name, website_url=None, internal_texts=No
             import datetime
             api_key = os.getenv('POLYGON_API_KEY')
             client = RESTClient(api_key)
-            details = client.get_ticker_details(ticker)
+            with politeness.slot(POLYGON_API):
+                details = client.get_ticker_details(ticker)
             trends = []
             if details:
                 if hasattr(details, 'market_cap'):
@@ -425,7 +311,8 @@ def fetch_yahoo_finance_trends(company_name, website_url=None, internal_texts=No
                     trends.append(f"Employees: {details.total_employees}")
                 if hasattr(details, 'description'):
                     trends.append(f"Description: {details.description}")
-            fundamentals = client.get_stock_financials(ticker, limit=3)
+            with politeness.slot(POLYGON_API):
+                fundamentals = client.get_stock_financials(ticker, limit=3)
             years = []
             revenues = []
             net_incomes = []
@@ -450,9 +337,10 @@ def fetch_yahoo_finance_trends(company_name, website_url=None, internal_texts=No
                     chart_data.append(chart)
             today = datetime.date.today()
             start = today.replace(year=today.year-3)
-            aggs = list(client.list_aggs(ticker, 1, "month", start.isoformat(), today.isoformat(), limit=36))
+            with politeness.slot(POLYGON_API):
+                aggs = list(client.list_aggs(ticker, 1, "month", start.isoformat(), today.isoformat(), limit=36))
             if aggs:
-                months = [datetime.datetime.fromtimestamp(a.timestamp/1000).strftime('%Y-%m') for a in aggs]
+                months = [datetime.datetime.fromtimestamp(a.timestamp/1000) for a in aggs]
                 closes = [a.close for a in aggs]
                 chart = generate_price_trend_chart(months, closes)
                 if chart:
@@ -468,13 +356,14 @@ def fetch_yahoo_finance_trends(company_name, website_url=None, internal_texts=No
             ts = TimeSeries(key=api_key, output_format='pandas')
             symbol = ticker.replace('.NS', '') if ticker.endswith('.NS') else ticker.replace('.BO', '')
             av_ticker = f'NSE:{symbol}' if ticker.endswith('.NS') else f'BSE:{symbol}'
-            data, meta = ts.get_daily(symbol=av_ticker, outputsize='compact')
+            with politeness.slot(ALPHA_VANTAGE_API):
+                data, meta = ts.get_daily(symbol=av_ticker, outputsize='compact')
             data = data.sort_index()
             trends = []
             chart_data = []
             if not data.empty:
                 data_last3y = data.tail(750)
-                chart = generate_price_trend_chart(data_last3y.index.strftime('%Y-%m-%d').tolist(), data_last3y['4. close'].tolist())
+                chart = generate_price_trend_chart(data_last3y.index, data_last3y['4. close'])
                 if chart:
                     chart_data.append(chart)
                 years = sorted(set([d.year for d in data_last3y.index]), reverse=True)[:3]
@@ -486,9 +375,8 @@ def fetch_yahoo_finance_trends(company_name, website_url=None, internal_texts=No
         except Exception as e:
             pass
     try:
-        import yfinance as yf
-        yf_ticker = yf.Ticker(ticker)
-        info = yf_ticker.info
+        # Served from the local market store; yfinance is only called when a dataset's TTL has passed
+        info = market_store.get_info(ticker)
         trends = []
         def fmt(val):
             if val is None:
@@ -516,7 +404,7 @@ def fetch_yahoo_finance_trends(company_name, website_url=None, internal_texts=No
         trends = [t for t in trends if 'N/A' not in t]
         chart_data = []
         # Try to get 3 years of revenue/net income from yfinance financials
-        fin = yf_ticker.financials
+        fin = market_store.get_financials(ticker)
         if not fin.empty:
             years = fin.columns[:3][::-1]
             if 'Total Revenue' in fin.index:
@@ -530,46 +418,49 @@ def fetch_yahoo_finance_trends(company_name, website_url=None, internal_texts=No
                 if chart:
                     chart_data.append(chart)
         # Price trend (last 3 years)
-        hist = yf_ticker.history(period='3y')
+        hist = market_store.get_history(ticker, years=3)
         if not hist.empty:
-            chart = generate_price_trend_chart(hist.index.strftime('%Y-%m-%d').tolist(), hist['Close'].tolist())
+            chart = generate_price_trend_chart(hist.index, hist['Close'])
             if chart:
                 chart_data.append(chart)
         return trends, chart_data
     except Exception:
         if internal_texts is None or pdf_texts is None:
             return [], []
-        all_texts = [t['text'] for t in internal_texts] + pdf_texts
-        fin_dict, years = extract_financials_from_texts(all_texts)
-        if not fin_dict:
-            return [], []
-        import matplotlib.pyplot as plt
-        charts = []
-        for metric in ['Revenue', 'Net Profit']:
-            vals = [(y, fin_dict.get(f"{metric} {y}")) for y in years if fin_dict.get(f"{metric} {y}")]
-            if vals:
-                y_labels, v_labels = zip(*vals)
-                def parse_val(v):
-                    v = v.replace(',', '').replace('INR', '').replace('₹', '').replace('$', '').strip()
-                    if 'billion' in v.lower():
-                        return float(re.findall(r'[\d.]+', v)[0]) * 1e9
-                    if 'million' in v.lower():
-                        return float(re.findall(r'[\d.]+', v)[0]) * 1e6
-                    if 'crore' in v.lower():
-                        return float(re.findall(r'[\d.]+', v)[0]) * 1e7
-                    if 'lakh' in v.lower():
-                        return float(re.findall(r'[\d.]+', v)[0]) * 1e5
-                    try:
-                        return float(re.findall(r'[\d.]+', v)[0])
-                    except Exception:
-                        return None
-                values = [parse_val(v) for v in v_labels]
-                if any(values):
-                    chart = generate_revenue_chart(y_labels, values) if metric == 'Revenue' else generate_netincome_chart(y_labels, values)
-                    if chart:
-                        charts.append(chart)
-        trends = [f"{k}: {v}" for k, v in fin_dict.items()]
-        return trends, charts
+        return financial_trends_from_texts(internal_texts, pdf_texts)
+
+def financial_trends_from_texts(internal_texts, pdf_texts):
+    # Fallback when no market data source answered: regex the crawled pages and PDFs
+    all_texts = [t['text'] for t in internal_texts] + pdf_texts
+    fin_dict, years = extract_financials_from_texts(all_texts)
+    if not fin_dict:
+        return [], []
+    charts = []
+    for metric in ['Revenue', 'Net Profit']:
+        vals = [(y, fin_dict.get(f"{metric} {y}")) for y in years if fin_dict.get(f"{metric} {y}")]
+        if vals:
+            y_labels, v_labels = zip(*vals)
+            def parse_val(v):
+                v = v.replace(',', '').replace('INR', '').replace('₹', '').replace('$', '').strip()
+                if 'billion' in v.lower():
+                    return float(re.findall(r'[\d.]+', v)[0]) * 1e9
+                if 'million' in v.lower():
+                    return float(re.findall(r'[\d.]+', v)[0]) * 1e6
+                if 'crore' in v.lower():
+                    return float(re.findall(r'[\d.]+', v)[0]) * 1e7
+                if 'lakh' in v.lower():
+                    return float(re.findall(r'[\d.]+', v)[0]) * 1e5
+                try:
+                    return float(re.findall(r'[\d.]+', v)[0])
+                except Exception:
+                    return None
+            values = [parse_val(v) for v in v_labels]
+            if any(values):
+                chart = generate_revenue_chart(y_labels, values) if metric == 'Revenue' else generate_netincome_chart(y_labels, values)
+                if chart:
+                    charts.append(chart)
+    trends = [f"{k}: {v}" for k, v in fin_dict.items()]
+    return trends, charts
 
 def extract_financials_from_texts(texts):
     # Try to extract revenue, net profit, and growth for up to 3 years from a list of texts
@@ -642,51 +533,30 @@ def extract_financials_from_texts(texts):
 def generate_revenue_chart(years, revenues):
     if len(years) < 2:
         return None
-    fig, ax = plt.subplots(figsize=(4,3))
-    ax.bar(years, [r/1e9 for r in revenues], color='#4682B4')
-    ax.set_title('Revenue (USD Billions)')
-    ax.set_ylabel('USD Billions')
-    ax.set_xlabel('Year')
-    plt.tight_layout()
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png')
-    plt.close(fig)
-    buf.seek(0)
-    return buf
+    return chart_service.render_buffer('bar', years, [r/1e9 for r in revenues], figsize=(4, 3), color='#4682B4',
+                                       title='Revenue (USD Billions)', ylabel='USD Billions', xlabel='Year')
 
 def generate_netincome_chart(years, net_incomes):
     if len(years) < 2:
         return None
-    fig, ax = plt.subplots(figsize=(4,3))
-    ax.bar(years, [n/1e9 for n in net_incomes], color='#2E8B57')
-    ax.set_title('Net Income (USD Billions)')
-    ax.set_ylabel('USD Billions')
-    ax.set_xlabel('Year')
-    plt.tight_layout()
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png')
-    plt.close(fig)
-    buf.seek(0)
-    return buf
+    return chart_service.render_buffer('bar', years, [n/1e9 for n in net_incomes], figsize=(4, 3), color='#2E8B57',
+                                       title='Net Income (USD Billions)', ylabel='USD Billions', xlabel='Year')
 
 def generate_price_trend_chart(dates, closes):
+    # Downsampled to a pixel-appropriate number of points on a real date axis, so render time does not grow with history
+    dates, closes = chart_service.time_series(dates, closes)
     if len(dates) < 2:
         return None
-    fig, ax = plt.subplots(figsize=(6,3))
-    ax.plot(dates, closes, marker='o', linewidth=1)
-    ax.set_title('Price Trend (3Y)')
-    ax.set_xlabel('Date')
-    ax.set_ylabel('Close Price')
-    fig.autofmt_xdate(rotation=45)
-    plt.tight_layout()
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png')
-    plt.close(fig)
-    buf.seek(0)
-    return buf
+    return chart_service.render_buffer('line', dates, closes, figsize=(6, 3), linewidth=1.2, date_axis=True,
+                                       title='Price Trend (3Y)', xlabel='Date', ylabel='Close Price')
 
 # --- 5. Aggregation & Summarization ---
 def aggregate_company_content(company_name, website, internal_texts, pdf_texts, news, leadership):
+    # Near-identical pages would only burn the fixed context budget
+    internal_texts, dropped_pages = dedupe_texts(internal_texts, key=lambda p: p['text'])
+    pdf_texts, dropped_pdfs = dedupe_texts(pdf_texts)
+    if dropped_pages or dropped_pdfs:
+        logging.info(f"[aggregate_company_content] Dropped {dropped_pages} near-duplicate pages and {dropped_pdfs} PDFs")
     # Concatenate all text sources
     content = f"Company: {company_name}\nWebsite: {website}\n\n"
     content += "=== Internal Pages ===\n"
@@ -704,19 +574,63 @@ def aggregate_company_content(company_name, website, internal_texts, pdf_texts,
     return content[:12000]  # Truncate for LLM
 
 # --- 6. Main Orchestrator ---
+def fetch_news(company_name):
+    news = fetch_gnews(company_name)
+    if not news:
+        news = fetch_google_news(company_name)
+    return news
+
+def fetch_sources_concurrently(jobs, deadlines=None):
+    """
+    Run each source job {name: callable} in its own worker and wait for each one
+    up to its deadline (seconds from the start of the fan-out).
+    Returns ({name: result} for the sources that finished, [names that missed their deadline or failed]).
+    """
+    deadlines = deadlines or SOURCE_DEADLINES
+    results = {}
+    missing = []
+    executor = ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix='source')
+    start = time.monotonic()
+    futures = {name: executor.submit(fn) for name, fn in jobs.items()}
+    for name, fut in futures.items():
+        remaining = max(0, start + deadlines.get(name, 30) - time.monotonic())
+        try:
+            results[name] = fut.result(timeout=remaining)
+        except FutureTimeoutError:
+            logging.warning(f"[run_advanced_crawler] Source '{name}' missed its {deadlines.get(name, 30)}s deadline")
+            missing.append(name)
+        except Exception as e:
+            logging.warning(f"[run_advanced_crawler] Source '{name}' failed: {e}")
+            missing.append(name)
+    # Do not block on stragglers; their results are simply discarded
+    executor.shutdown(wait=False, cancel_futures=True)
+    return results, missing
+
 def run_advanced_crawler(company_name):
     website = resolve_company_website_duckduckgo(company_name)
     if not website:
         return None, f"Could not resolve website for {company_name}."
-    internal_texts, pdf_texts = crawl_internal_pages(website)
-    news = fetch_gnews(company_name)
-    if not news:
-        news = fetch_google_news(company_name)
-    leadership = fetch_leadership_info(company_name, website)
-    wikipedia_summary = fetch_wikipedia_summary(company_name)
-    yahoo_summary = fetch_yahoo_finance_summary(company_name)
-    yahoo_trends, chart_data = fetch_yahoo_finance_trends(company_name, website, internal_texts, pdf_texts)
+    jobs = {
+        'internal_pages': lambda: crawl_internal_pages(website),
+        'news': lambda: fetch_news(company_name),
+        'leadership': lambda: fetch_leadership_info(company_name, website),
+        'wikipedia': lambda: fetch_wikipedia_summary(company_name),
+        'yahoo_summary': lambda: fetch_yahoo_finance_summary(company_name),
+        # Crawled texts are not available yet; the text-based fallback runs below once the crawl is in
+        'yahoo_trends': lambda: fetch_yahoo_finance_trends(company_name, website),
+    }
+    results, missing = fetch_sources_concurrently(jobs)
+    internal_texts, pdf_texts = results.get('internal_pages', ([], []))
+    news = results.get('news', [])
+    leadership = results.get('leadership', [])
+    wikipedia_summary = results.get('wikipedia', "")
+    yahoo_summary = results.get('yahoo_summary', "")
+    yahoo_trends, chart_data = results.get('yahoo_trends', ([], []))
+    if not yahoo_trends and (internal_texts or pdf_texts):
+        yahoo_trends, chart_data = financial_trends_from_texts(internal_texts, pdf_texts)
     content = f"Company: {company_name}\nWebsite: {website}\n\n"
+    if missing:
+        content += "Missing sources (timed out or failed): " + ", ".join(missing) + "\n\n"
     if wikipedia_summary:
         content += "=== Wikipedia Overview ===\n" + wikipedia_summary + "\n\n"
     if yahoo_summary:
@@ -1,12 +1,14 @@
 from flask import Flask, request, redirect, session, jsonify, send_from_directory, render_template, url_for
 import os
 import re
-import requests
+import http_client
 import threading
 from urllib.parse import urlparse
 from dotenv import load_dotenv
 from my_crawler import fetch_text_from_url, extract_ir_links
-from pdf_parser import extract_text_from_pdf
+from pdf_parser import extract_text_from_pdf, extract_financial_text
+from financial_tables import financials_from_pdf
+from ir_downloader import iter_downloads
 from summarizer import init_gemini, summarize_chunks, extract_financials, generate_swot_analysis, compare_companies_summary, extract_business_segments, answer_question, detect_trends, detect_red_flags_and_opportunities, extract_timeline_events, analyze_company
 from pdf_exporter import export_summary_to_pdf
 from ppt_exporter import export_summary_to_ppt, add_title_slide, add_financials_slide, add_swot_slide, add_comparison_slide, add_financials_bar_chart_slide, add_business_segments_pie_chart_slide, add_trends_slide, add_red_flags_opportunities_slide, add_timeline_slide
@@ -18,11 +20,14 @@ from pptx.enum.text import PP_ALIGN
 from pptx.util import Inches
 import logging
 from bs4 import BeautifulSoup
-from advanced_crawler import run_advanced_crawler, resolve_company_website_duckduckgo
+import chart_service
+import html_extract
+import leadership_extract
+import market_store
+import ticker_resolver
+from advanced_crawler import run_advanced_crawler, resolve_company_website_duckduckgo, extract_leadership_from_website
 import io
 import pandas as pd
-import matplotlib.pyplot as plt
-import pdfplumber
 from googlesearch import search
 import datetime
 try:
@@ -109,7 +114,7 @@ def oauth_callback():
         "redirect_uri": REDIRECT_URI
     }
 
-    response = requests.post(TOKEN_URL, data=data)
+    response = http_client.post(TOKEN_URL, data=data)
     if response.status_code != 200:
         return f"Failed to get token: {response.text}", 400
 
@@ -131,7 +136,7 @@ def profile():
         return redirect("/login")
 
     headers = {"Authorization": f"Bearer {access_token}"}
-    user_info = requests.get(f"{instance_url}/services/oauth2/userinfo", headers=headers)
+    user_info = http_client.get(f"{instance_url}/services/oauth2/userinfo", headers=headers)
     return jsonify(user_info.json())
 
 
@@ -263,7 +268,7 @@ def slack_interactions():
                         "title": f"{company_name} Financial Chart"
                     }
                     headers = {"Authorization": f"Bearer {SLACK_BOT_TOKEN}"}
-                    requests.post("https://slack.com/api/files.upload", params=payload, files=files, headers=headers)
+                    http_client.post("https://slack.com/api/files.upload", params=payload, files=files, headers=headers)
         elif action_id == "risks_opps":
             blocks = [
                 {
@@ -424,17 +429,18 @@ def slack_file_upload():
     try:
         # Download file from Slack
         headers = {"Authorization": f"Bearer {SLACK_BOT_TOKEN}"}
-        r = requests.get(file_url, headers=headers)
+        r = http_client.get(file_url, headers=headers)
         os.makedirs("downloads", exist_ok=True)
         local_path = f"downloads/{filename}"
         with open(local_path, "wb") as f:
             f.write(r.content)
 
         # Extract text/data
+        table_financials = {}
         if filetype in ["pdf"]:
-            import pdfplumber
-            with pdfplumber.open(local_path) as pdf:
-                text = "\n".join(page.extract_text() or "" for page in pdf.pages)
+            # Statement tables give typed values directly; text is only needed for the regex/LLM fallback
+            table_financials = financials_from_pdf(local_path)
+            text = "" if table_financials else extract_financial_text(local_path)
             df = None
         elif filetype in ["xlsx", "xls"]:
             import pandas as pd
@@ -450,52 +456,20 @@ def slack_file_upload():
 
         # Extract financials
         from summarizer import extract_financials
-        financials = extract_financials(text)
+        financials = table_financials or extract_financials(text)
         summary = "\n".join([f"{k}: {v}" for k, v in financials.items()])
 
         # Visualization: try multiple chart types if possible
-        import matplotlib.pyplot as plt
-        chart_paths = []
-        # Bar chart for all numeric metrics
         metrics = []
         values = []
         for k, v in financials.items():
             try:
-                num = float(v.replace(",", "").replace("₹", "").replace("$", "").replace("%", ""))
+                num = float(str(v).replace(",", "").replace("₹", "").replace("$", "").replace("%", ""))
                 metrics.append(k)
                 values.append(num)
             except Exception:
                 continue
-        if metrics and values:
-            # Bar chart
-            plt.figure(figsize=(6, 4))
-            plt.bar(metrics, values, color="#4682B4")
-            plt.title("Key Financials (Bar Chart)")
-            plt.tight_layout()
-            bar_path = f"downloads/{filename}_bar.png"
-            plt.savefig(bar_path)
-            plt.close()
-            chart_paths.append(bar_path)
-            # Line chart (if more than 2 metrics)
-            if len(metrics) > 2:
-                plt.figure(figsize=(6, 4))
-                plt.plot(metrics, values, marker='o', color="#2E8B57")
-                plt.title("Key Financials (Line Chart)")
-                plt.tight_layout()
-                line_path = f"downloads/{filename}_line.png"
-                plt.savefig(line_path)
-                plt.close()
-                chart_paths.append(line_path)
-            # Pie chart (if 3-8 metrics, e.g. expense breakdown)
-            if 3 <= len(metrics) <= 8:
-                plt.figure(figsize=(6, 4))
-                plt.pie(values, labels=metrics, autopct='%1.1f%%', startangle=140)
-                plt.title("Key Financials (Pie Chart)")
-                plt.tight_layout()
-                pie_path = f"downloads/{filename}_pie.png"
-                plt.savefig(pie_path)
-                plt.close()
-                chart_paths.append(pie_path)
+        chart_paths = render_metric_charts(filename, metrics, values)
 
         # Respond in Slack
         if summary.strip():
@@ -509,7 +483,7 @@ def slack_file_upload():
                         "title": "Financials Chart"
                     }
                     headers = {"Authorization": f"Bearer {SLACK_BOT_TOKEN}"}
-                    requests.post("https://slack.com/api/files.upload", params=payload, files=files, headers=headers)
+                    http_client.post("https://slack.com/api/files.upload", params=payload, files=files, headers=headers)
         else:
             send_slack(channel_id, "❌ Could not extract financials from this file. Please check the format or try another file.", thread_ts=thread_ts)
 
@@ -532,24 +506,21 @@ def process_summary_task(user_input, channel_id, thread_ts=None):
             pdf_links = extract_ir_links(user_input)
             logging.info(f"[process_summary_task] Found {len(pdf_links)} PDF links")
             pdf_texts = ""
-            for link in pdf_links:
-                if link.endswith(".pdf"):
-                    try:
-                        filename = link.split("/")[-1]
-                        r = requests.get(link, timeout=10)
-                        with open(filename, 'wb') as f:
-                            f.write(r.content)
-                        pdf_texts += extract_text_from_pdf(filename)
-                        logging.info(f"[process_summary_task] Downloaded and parsed PDF: {filename}")
-                    except Exception as e:
-                        logging.error(f"[process_summary_task] Error downloading/parsing PDF {link}: {e}")
-                        continue
+            # PDFs download concurrently; each is parsed as soon as it lands
+            for doc in iter_downloads([link for link in pdf_links if link.endswith(".pdf")]):
+                try:
+                    pdf_texts += extract_text_from_pdf(doc['path'], max_chars=12000)
+                    logging.info(f"[process_summary_task] Downloaded and parsed PDF: {doc['filename']}")
+                except Exception as e:
+                    logging.error(f"[process_summary_task] Error parsing PDF {doc['url']}: {e}")
+                    continue
             full_context = (main_text + "\n\n" + pdf_texts)[:12000]
             logging.info(f"[process_summary_task] Context length: {len(full_context)}")
             summary = re.sub(r"\*+", "", summarize_chunks(full_context)).strip()
             logging.info("[process_summary_task] Summary generated")
             ext = extract(user_input)
             company_name = ext.domain.capitalize()
+            price_history = None
         else:
             logging.info("[process_summary_task] Detected company name input")
             content, err = run_advanced_crawler(user_input)
@@ -560,6 +531,7 @@ def process_summary_task(user_input, channel_id, thread_ts=None):
             logging.info(f"[process_summary_task] Aggregated content length: {len(content)}")
             summary = re.sub(r"\*+", "", summarize_chunks(content)).strip()
             logging.info("[process_summary_task] Summary generated (company name flow)")
+            price_history = stored_price_history(user_input)
             company_name = user_input.capitalize()
             user_input = resolve_company_website_duckduckgo(user_input) or user_input
 
@@ -583,7 +555,7 @@ def process_summary_task(user_input, channel_id, thread_ts=None):
         ppt_path = f"downloads/{company_name}_Summary.pptx"
         export_summary_to_pdf(summary, pdf_path)
         logging.info(f"[process_summary_task] PDF exported: {pdf_path}")
-        export_summary_to_ppt(summary, ppt_path, company_name)
+        export_summary_to_ppt(summary, ppt_path, company_name, price_history=price_history)
         logging.info(f"[process_summary_task] PPT exported: {ppt_path}")
 
         pdf_url = f"{NGROK_DOMAIN}/downloads/{company_name}_Summary.pdf"
@@ -661,7 +633,7 @@ def send_slack(channel_id, text=None, blocks=None, thread_ts=None):
     if blocks:
         payload["blocks"] = blocks
 
-    response = requests.post("https://slack.com/api/chat.postMessage", json=payload, headers=headers)
+    response = http_client.post("https://slack.com/api/chat.postMessage", json=payload, headers=headers)
     logging.info(f"[send_slack] Slack API response: {response.status_code} {response.text}")
 
 
@@ -672,18 +644,13 @@ def process_company(url):
     pdf_links = extract_ir_links(url)
     logging.info(f"[process_company] Found {len(pdf_links)} PDF links")
     pdf_texts = ""
-    for link in pdf_links:
-        if link.endswith(".pdf"):
-            try:
-                filename = link.split("/")[-1]
-                r = requests.get(link, timeout=10)
-                with open(filename, 'wb') as f:
-                    f.write(r.content)
-                pdf_texts += extract_text_from_pdf(filename)
-                logging.info(f"[process_company] Downloaded and parsed PDF: {filename}")
-            except Exception as e:
-                logging.error(f"[process_company] Error downloading/parsing PDF {link}: {e}")
-                continue
+    for doc in iter_downloads([link for link in pdf_links if link.endswith(".pdf")]):
+        try:
+            pdf_texts += extract_text_from_pdf(doc['path'], max_chars=12000)
+            logging.info(f"[process_company] Downloaded and parsed PDF: {doc['filename']}")
+        except Exception as e:
+            logging.error(f"[process_company] Error parsing PDF {doc['url']}: {e}")
+            continue
     full_context = (main_text + "\n\n" + pdf_texts)[:12000]
     max_chars = 8000
     full_context = full_context[:max_chars]
@@ -768,6 +735,10 @@ def get_key_executives(company_name):
     results = list(search(query, num_results=12, lang='en'))
     leadership_urls = [url for url in results if any(x in url.lower() for x in ['leadership', 'management', 'team', 'executive'])]
     snippets = []
+    # Leaders already extracted from the company website (shared with the crawler's org chart, cached per domain)
+    website = resolve_company_website_duckduckgo(company_name) if leadership_extract.LEADERSHIP_FROM_WEBSITE else None
+    if website:
+        snippets.extend(f"{l['name']}: {l['role']}" for l in extract_leadership_from_website(website))
     # If we have a leadership page, fetch its text for better extraction
     if leadership_urls:
         snippets.append(get_leadership_text(leadership_urls[0]))
@@ -797,10 +768,8 @@ Web search results:
 
 def get_leadership_text(url):
     try:
-        resp = requests.get(url, timeout=10)
-        soup = BeautifulSoup(resp.text, 'html.parser')
-        texts = soup.stripped_strings
-        return '\n'.join(texts)
+        resp = http_client.get(url, timeout=10)
+        return html_extract.all_text(resp.text)
     except Exception:
         return ''
 
@@ -815,7 +784,7 @@ def get_company_logo_url(company_name):
         website = resolve_company_website_duckduckgo(company_name)
         if not website:
             return None
-        resp = requests.get(website, timeout=10, headers={
+        resp = http_client.get(website, timeout=10, headers={
             "User-Agent": (
                 "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
                 "AppleWebKit/537.36 (KHTML, like Gecko) "
@@ -945,39 +914,66 @@ def slack_test_yfinance():
     channel_id = request.form.get("channel_id")
     if not ticker or not channel_id:
         return "Missing ticker or channel_id", 400
-    import yfinance as yf
-    t = yf.Ticker(ticker)
-    info = t.info
+    # Accept a company name as well as a symbol
+    if not ticker.isupper():
+        ticker = ticker_resolver.resolve(ticker) or ticker
+    info = market_store.get_info(ticker)
     msg = f"*yfinance info for {ticker}:*\n" + "\n".join([f"{k}: {v}" for k, v in info.items() if k in ['marketCap','totalRevenue','netIncomeToCommon','trailingPE','forwardPE','priceToSalesTrailing12Months','priceToBook','enterpriseToEbitda','trailingEps','revenueGrowth','recommendationKey']])
     send_slack(channel_id, text=msg)
     return "", 200
 
 
-def download_and_parse_financial_docs(links, download_dir='downloads'):
-    os.makedirs(download_dir, exist_ok=True)
+def stored_price_history(company_name):
+    """(dates, closes) for the last 3 years from the market store (fetched only when stale), or None."""
+    try:
+        ticker = ticker_resolver.resolve(company_name)
+        hist = market_store.get_history(ticker) if ticker else None
+    except Exception as e:
+        logging.info(f"[stored_price_history] No price history for {company_name}: {e}")
+        return None
+    if hist is None or hist.empty:
+        return None
+    return hist.index, hist['Close']
+
+def render_metric_charts(filename, metrics, values):
+    """
+    Bar chart of the metrics, plus line (3+ metrics) and pie (3-8 positive values) charts; rendered concurrently,
+    returns PNG paths. The pie leaves out losses and zeros, which have no slice.
+    """
+    if not metrics:
+        return []
+    charts = [('bar', metrics, values, dict(color="#4682B4", title="Key Financials (Bar Chart)"))]
+    if len(metrics) > 2:
+        charts.append(('line', metrics, values, dict(marker='o', color="#2E8B57", title="Key Financials (Line Chart)")))
+    positive = [(m, v) for m, v in zip(metrics, values) if v > 0]
+    if 3 <= len(positive) <= 8:
+        pie_metrics, pie_values = zip(*positive)
+        charts.append(('pie', list(pie_metrics), list(pie_values), dict(title="Key Financials (Pie Chart)")))
+    rendering = [(kind, chart_service.submit(kind, x, y, **style)) for kind, x, y, style in charts]
+    paths = []
+    for kind, future in rendering:
+        path = f"downloads/{filename}_{kind}.png"
+        with open(path, "wb") as f:
+            f.write(chart_service.result(future))
+        paths.append(path)
+    return paths
+
+
+def download_and_parse_financial_docs(links):
     summaries = []
-    for link in links:
+    # Only real PDF / Excel bodies come back (HTML pages are sniffed out); parsing overlaps the other downloads
+    for doc in iter_downloads(links, kinds=('pdf', 'xls', 'xlsx')):
         try:
-            filename = link.split('/')[-1].split('?')[0]
-            local_path = os.path.join(download_dir, filename)
-            r = requests.get(link, timeout=15)
-            with open(local_path, 'wb') as f:
-                f.write(r.content)
             # Parse based on file type
-            if filename.lower().endswith('.pdf'):
-                with pdfplumber.open(local_path) as pdf:
-                    text = '\n'.join(page.extract_text() or '' for page in pdf.pages)
-            elif filename.lower().endswith(('.xls', '.xlsx')):
-                df = pd.read_excel(local_path)
-                text = df.to_string()
-            else:
-                with open(local_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    text = f.read()
             from summarizer import extract_financials
-            financials = extract_financials(text)
-            summaries.append({'file': filename, 'financials': financials, 'link': link})
+            if doc['kind'] == 'pdf':
+                financials = financials_from_pdf(doc['path']) or extract_financials(extract_financial_text(doc['path']))
+            else:
+                df = pd.read_excel(doc['path'])
+                financials = extract_financials(df.to_string())
+            summaries.append({'file': doc['filename'], 'financials': financials, 'link': doc['url']})
         except Exception as e:
-            print(f'Error processing {link}: {e}')
+            print(f"Error processing {doc['url']}: {e}")
     return summaries
 
 
@@ -1008,7 +1004,7 @@ def handle_file_share_message_event(event):
         send_slack(channel_id, "⏳ Analyzing your file for financials, please wait...")
         try:
             headers = {"Authorization": f"Bearer {SLACK_BOT_TOKEN}"}
-            r = requests.get(file_url, headers=headers)
+            r = http_client.get(file_url, headers=headers)
             os.makedirs("downloads", exist_ok=True)
             local_path = f"downloads/{filename}"
             with open(local_path, "wb") as f:
@@ -1017,9 +1013,9 @@ def handle_file_share_message_event(event):
             text = ""
             extracted_metrics = {}
             if filetype in ["pdf"]:
-                import pdfplumber
-                with pdfplumber.open(local_path) as pdf:
-                    text = "\n".join(page.extract_text() or "" for page in pdf.pages)
+                extracted_metrics = financials_from_pdf(local_path)
+                if not extracted_metrics:
+                    text = extract_financial_text(local_path)
             elif filetype in ["xlsx", "xls"]:
                 import pandas as pd
                 excel = pd.ExcelFile(local_path)
@@ -1062,12 +1058,13 @@ def handle_file_share_message_event(event):
                 return
 
             from summarizer import extract_financials
-            text_metrics = extract_financials(text)
-            metrics = {**text_metrics, **{k: v for k, v in extracted_metrics.items() if v and v != 'nan'}}
+            found_metrics = {k: v for k, v in extracted_metrics.items() if v and v != 'nan'}
+            # A PDF's statement tables replace the regex/LLM pass; labelled spreadsheet cells only cover a
+            # few metrics, so spreadsheets are always read by it too and the cell values win where both exist
+            text_metrics = {} if filetype == "pdf" and found_metrics else extract_financials(text)
+            metrics = {**text_metrics, **found_metrics}
             summary = "\n".join([f"{k}: {v}" for k, v in metrics.items()])
 
-            import matplotlib.pyplot as plt
-            chart_paths = []
             metrics_for_chart = []
             values = []
             for k, v in metrics.items():
@@ -1077,35 +1074,7 @@ def handle_file_share_message_event(event):
                     values.append(num)
                 except Exception:
                     continue
-            if metrics_for_chart and values:
-                # Always generate a bar chart if at least one value
-                plt.figure(figsize=(6, 4))
-                plt.bar(metrics_for_chart, values, color="#4682B4")
-                plt.title("Key Financials (Bar Chart)")
-                plt.tight_layout()
-                bar_path = f"downloads/{filename}_bar.png"
-                plt.savefig(bar_path)
-                plt.close()
-                chart_paths.append(bar_path)
-                # Only generate line/pie charts if enough metrics
-                if len(metrics_for_chart) > 2:
-                    plt.figure(figsize=(6, 4))
-                    plt.plot(metrics_for_chart, values, marker='o', color="#2E8B57")
-                    plt.title("Key Financials (Line Chart)")
-                    plt.tight_layout()
-                    line_path = f"downloads/{filename}_line.png"
-                    plt.savefig(line_path)
-                    plt.close()
-                    chart_paths.append(line_path)
-                if 3 <= len(metrics_for_chart) <= 8:
-                    plt.figure(figsize=(6, 4))
-                    plt.pie(values, labels=metrics_for_chart, autopct='%1.1f%%', startangle=140)
-                    plt.title("Key Financials (Pie Chart)")
-                    plt.tight_layout()
-                    pie_path = f"downloads/{filename}_pie.png"
-                    plt.savefig(pie_path)
-                    plt.close()
-                    chart_paths.append(pie_path)
+            chart_paths = render_metric_charts(filename, metrics_for_chart, values)
 
             if summary.strip():
                 send_slack(channel_id, f"✅ Financials extracted:\n{summary}")
@@ -1117,7 +1086,7 @@ def handle_file_share_message_event(event):
                             "title": "Financials Chart"
                         }
                         headers = {"Authorization": f"Bearer {SLACK_BOT_TOKEN}"}
-                        requests.post("https://slack.com/api/files.upload", params=payload, files=files, headers=headers)
+                        http_client.post("https://slack.com/api/files.upload", params=payload, files=files, headers=headers)
             else:
                 send_slack(channel_id, "❌ Could not extract financials from this file. Please check the format or try another file.")
 
@@ -0,0 +1,181 @@
+import io
+import os
+import json
+import hashlib
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import pandas as pd
+import matplotlib
+import matplotlib.dates as mdates
+from matplotlib.figure import Figure
+from disk_cache import DiskCache
+
+# --- CONFIG ---
+CHART_PROCESS_WORKERS = int(os.getenv('CHART_PROCESS_WORKERS', 2))  # 0 renders in the calling thread
+CHART_CACHE_MAX_BYTES = int(os.getenv('CHART_CACHE_MAX_BYTES', 128 * 1024 * 1024))
+# Bump when _draw changes how a chart looks, so PNGs from the old renderer are not served
+CHART_VERSION = f"mpl-{matplotlib.__version__}-1"
+DEFAULT_FIGSIZE = (6, 4)
+# Points kept for a time series: about two pixels per point on a 6-inch, 100 dpi chart
+SERIES_MAX_POINTS = int(os.getenv('CHART_SERIES_MAX_POINTS', 300))
+
+_pool = None
+_pool_lock = threading.Lock()
+_cache = None
+
+def _get_cache():
+    global _cache
+    if _cache is None:
+        _cache = DiskCache('charts', max_bytes=CHART_CACHE_MAX_BYTES)
+    return _cache
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # Same start method as pdf_parser's pool: a fork could inherit a lock some other thread holds
+                _pool = ProcessPoolExecutor(max_workers=CHART_PROCESS_WORKERS, mp_context=multiprocessing.get_context('forkserver'))
+    return _pool
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        _pool = None
+
+def _plain(values):
+    """Series/Index/ndarray -> list of plain Python values (picklable, stable to hash)."""
+    values = values.tolist() if hasattr(values, 'tolist') else list(values)
+    return [v.item() if hasattr(v, 'item') and not hasattr(v, 'strftime') else v for v in values]
+
+def lttb_indices(x, y, n_out):
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets downsampling of (x, y) to n_out points.
+    Always keeps the first and last point; inputs are numeric arrays (datetimes as int64 nanoseconds).
+    One NumPy step per output bucket, so the cost does not grow with the Python-level loop over input points.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # Bucket boundaries for the n_out - 2 middle buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        # Average of the next bucket (or the last point) is the third triangle vertex
+        next_start, next_end = end, (edges[i + 2] if i + 2 < len(edges) else n)
+        next_x = x[next_start:next_end].mean() if next_end > next_start else x[-1]
+        next_y = y[next_start:next_end].mean() if next_end > next_start else y[-1]
+        area = np.abs((x[previous] - next_x) * (y[start:end] - y[previous])
+                      - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        kept[i + 1] = previous
+    return kept
+
+def time_series(dates, values, max_points=SERIES_MAX_POINTS):
+    """
+    (dates, values) ready to plot: dates parsed to naive datetimes ('2024-05-01', Timestamps, DatetimeIndex),
+    NaNs dropped, sorted, and LTTB-downsampled to at most max_points. Returns ([datetime], [float]).
+    """
+    index = pd.to_datetime(pd.Index(dates))
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    series = pd.Series(np.asarray(values, dtype=np.float64), index=index).dropna().sort_index()
+    if series.empty:
+        return [], []
+    kept = lttb_indices(series.index.asi8, series.to_numpy(), max_points)
+    series = series.iloc[kept]
+    return [t.to_pydatetime() for t in series.index], series.tolist()
+
+def chart_key(kind, x, y, style):
+    """Content hash of everything that affects the PNG."""
+    payload = json.dumps([CHART_VERSION, kind, x, y, sorted(style.items())], default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _draw(kind, x, y, style):
+    """Worker: render one chart with the object-oriented Figure API (no pyplot state) and return PNG bytes."""
+    fig = Figure(figsize=style.get('figsize', DEFAULT_FIGSIZE))
+    ax = fig.add_subplot()
+    if kind == 'bar':
+        ax.bar(x, y, color=style.get('color'))
+    elif kind == 'line':
+        ax.plot(x, y, marker=style.get('marker'), linewidth=style.get('linewidth'), color=style.get('color'))
+    elif kind == 'pie':
+        ax.pie(y, labels=x, autopct='%1.1f%%', startangle=140)
+    else:
+        raise ValueError(f"unknown chart kind {kind!r}")
+    if style.get('title'):
+        ax.set_title(style['title'])
+    if style.get('xlabel'):
+        ax.set_xlabel(style['xlabel'])
+    if style.get('ylabel'):
+        ax.set_ylabel(style['ylabel'])
+    if style.get('date_axis'):
+        locator = mdates.AutoDateLocator()
+        ax.xaxis.set_major_locator(locator)
+        ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+    if style.get('rotate_xlabels'):
+        fig.autofmt_xdate(rotation=style['rotate_xlabels'])
+    fig.tight_layout()
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png')
+    return buf.getvalue()
+
+def submit(kind, x, y, **style):
+    """
+    Start rendering a 'bar', 'line' or 'pie' chart of y over x (pie: x are the labels); returns a Future of PNG bytes.
+    style: title, xlabel, ylabel, color, marker, linewidth, figsize, rotate_xlabels (degrees),
+    date_axis (x are datetimes; concise auto-located date ticks).
+    Identical inputs are served from the 'charts' cache without rendering.
+    """
+    x, y = _plain(x), _plain(y)
+    key = chart_key(kind, x, y, style)
+    hit = _get_cache().get(key)
+    if hit is not None:
+        done = Future()
+        done.set_result(hit[0])
+        return done
+    if CHART_PROCESS_WORKERS > 0:
+        rendering = _get_pool().submit(_draw, kind, x, y, style)
+    else:
+        rendering = Future()
+        try:
+            rendering.set_result(_draw(kind, x, y, style))
+        except Exception as e:
+            rendering.set_exception(e)
+
+    def store(done):
+        if not done.cancelled() and done.exception() is None:
+            _get_cache().set(key, done.result())
+    rendering.add_done_callback(store)
+    return rendering
+
+def result(rendering):
+    """PNG bytes of a Future from submit. Raises RuntimeError if a worker process died (the pool is then recreated)."""
+    try:
+        return rendering.result()
+    except BrokenProcessPool:
+        _reset_pool()
+        raise RuntimeError("chart worker pool crashed")
+
+def render(kind, x, y, **style):
+    """PNG bytes of a chart; see submit and result."""
+    return result(submit(kind, x, y, **style))
+
+def render_buffer(kind, x, y, **style):
+    """The chart as a BytesIO positioned at 0, for callers that upload or embed a file object."""
+    return io.BytesIO(render(kind, x, y, **style))
+
+def render_to_file(path, kind, x, y, **style):
+    with open(path, 'wb') as f:
+        f.write(render(kind, x, y, **style))
+    logging.info(f"[chart_service] Wrote {path}")
+    return path
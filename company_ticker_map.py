@@ -100,17 +100,23 @@ COMPANY_TICKER_MAP = {
 
 def get_ticker(company_name_or_url):
     key = company_name_or_url.strip().lower()
-    # Try direct match
-    if key in COMPANY_TICKER_MAP:
-        return COMPANY_TICKER_MAP[key]
-    # Try extracting domain from URL
+    candidates = [key]
+    # Try extracting the company's domain from a URL: investors.infosys.com -> 'infosys.com', then 'infosys'
     if key.startswith("http"):
-        from urllib.parse import urlparse
-        domain = urlparse(key).netloc.replace("www.", "")
-        if domain in COMPANY_TICKER_MAP:
-            return COMPANY_TICKER_MAP[domain]
-    # Try partial match
-    for k, v in COMPANY_TICKER_MAP.items():
-        if k in key:
-            return v
-    return None 
\ No newline at end of file
+        from tldextract import extract
+        parts = extract(key)
+        candidates = [c for c in (parts.registered_domain, parts.domain) if c] or candidates
+    # Try direct match
+    for candidate in candidates:
+        if candidate in COMPANY_TICKER_MAP:
+            return COMPANY_TICKER_MAP[candidate]
+    # Exact alias, then the longest alias found as whole words, in the indexed securities universe
+    # (ticker_universe.csv plus this map)
+    from ticker_index import get_index
+    index = get_index()
+    for candidate in candidates:
+        listing = index.get(candidate)
+        if listing:
+            return listing.symbol
+    match = index.find_in(candidates[-1])
+    return match.symbol if match else None
@@ -0,0 +1,223 @@
+import os
+import re
+import time
+import heapq
+import logging
+import itertools
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError as FutureTimeoutError
+from urllib.parse import urljoin, urlparse, urldefrag
+import tldextract
+import crawl_state
+import politeness
+import url_discovery
+from crawler_service import submit_crawl
+from page_dedupe import NearDuplicateFilter, canonical_url
+
+# --- CONFIG ---
+CRAWL_TIME_BUDGET = float(os.getenv('CRAWL_TIME_BUDGET', 45))  # seconds of wall-clock per site
+CRAWL_TEXT_BUDGET = int(os.getenv('CRAWL_TEXT_BUDGET', 24000))  # characters of page text to collect per site
+CRAWL_CONCURRENCY = int(os.getenv('CRAWL_CONCURRENCY', 4))
+PAGE_TEXT_LIMIT = 5000  # per page, same cap as extract_main_text
+CRAWL_SAFETY_MAX_PAGES = 100
+CRAWL_MIN_SCORE = -5  # candidates scoring below this (privacy, careers, login...) are never fetched
+
+# Path/anchor keywords and their weight; same idea as is_relevant_subpage, with the pages we never use pushed down
+KEYWORD_WEIGHTS = {
+    'investor': 10, 'annual-report': 9, 'annual report': 9, 'annualreport': 9, 'results': 8,
+    'financial': 7, 'leadership': 8, 'management': 7, 'about': 7, 'board': 5, 'governance': 4,
+    'team': 4, 'company': 3, 'overview': 3, 'strategy': 3, 'product': 3, 'solutions': 2, 'services': 2,
+    'news': 2, 'press': 2, 'media': 1,
+    'career': -6, 'jobs': -6, 'privacy': -10, 'cookie': -10, 'terms': -8, 'legal': -6, 'login': -10,
+    'signin': -10, 'cart': -10, 'search': -6, 'tag': -3, 'contact': -2,
+}
+SKIP_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.zip', '.mp4', '.mp3', '.css', '.js', '.ico')
+
+def registered_domain(url):
+    return tldextract.extract(urlparse(url).netloc).registered_domain
+
+def normalize_url(url):
+    url, _ = urldefrag(url)
+    return url.rstrip('/') or url
+
+def score_url(url, anchor_text=''):
+    """Higher is fetched sooner: keyword hits in the path and anchor, minus depth and query-string penalties."""
+    parsed = urlparse(url)
+    haystack = f"{parsed.path.lower()} {anchor_text.lower()}"
+    score = sum(w for kw, w in KEYWORD_WEIGHTS.items() if kw in haystack)
+    depth = len([p for p in parsed.path.split('/') if p])
+    score -= depth * 0.5
+    if parsed.query:
+        score -= 2
+    if parsed.path.lower().endswith('.pdf'):
+        score += 2 if re.search(r'annual|report|result|investor|presentation', haystack) else -4
+    return score
+
+def _page_text(result):
+    text = getattr(result, 'markdown', '') or ''
+    return str(text)[:PAGE_TEXT_LIMIT]
+
+def _page_links(result, base_url):
+    links = getattr(result, 'links', None) or {}
+    for link in links.get('internal', []):
+        href = link.get('href') if isinstance(link, dict) else link
+        if href:
+            yield urljoin(base_url, href), (link.get('text') or '') if isinstance(link, dict) else ''
+
+def _render(url, timeout):
+    # Browser renders count against the site's politeness budget (rate, in-flight cap, crawl-delay) too
+    with politeness.slot(url, max_wait=max(timeout, 0.1)):
+        future = submit_crawl(url)
+        try:
+            result = future.result(timeout=max(timeout, 0.1))
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+    final_url = getattr(result, 'redirected_url', None) or url
+    return {
+        'final_url': final_url,
+        'text': _page_text(result),
+        'links': list(_page_links(result, final_url)),
+        'headers': getattr(result, 'response_headers', None) or {},
+    }
+
+def _fetch_page(url, deadline, site=None, lastmod=None):
+    """Rendered page dict; with a site key, an unchanged stored copy is reused instead of rendering."""
+    if site:
+        stored = crawl_state.reusable_page(site, url, lastmod)
+        if stored:
+            return {**stored, 'status': 'reused'}
+    page = _render(url, deadline - time.monotonic())
+    page['status'] = 'fetched'
+    if site:
+        page['status'] = crawl_state.save_page(site, url, page['text'], page['links'], page['final_url'],
+                                               page['headers'], lastmod)
+    return page
+
+def crawl_site(base_url, pdf_fetcher=None, time_budget=CRAWL_TIME_BUDGET, text_budget=CRAWL_TEXT_BUDGET,
+               seeds=None, incremental=False):
+    """
+    Best-first crawl of one site. Candidate URLs are scored before they are fetched, the best are rendered
+    first on the shared browser pool, and the crawl stops once time_budget seconds have passed or
+    text_budget characters of page text are collected. PDF links are handed to pdf_fetcher(url) -> text.
+    The frontier is seeded from robots.txt / sitemaps (url_discovery) plus the optional seeds iterable;
+    robots-disallowed URLs are never fetched, and renders go through the politeness scheduler, which applies
+    the site's rate limit and robots crawl-delay.
+    With incremental=True pages stored by an earlier crawl are reused when their sitemap lastmod or HTTP
+    validators show no change (see crawl_state); only new or changed pages are rendered.
+    Returns {'pages': [{'url', 'text', 'score'}], 'pdf_texts': [...], 'changed_urls': [...], 'stats': {...}},
+    pages best first; changed_urls lists pages whose text changed since the stored crawl, plus new pages
+    that no earlier crawl had seen linked (a page an earlier crawl found but ran out of budget for is
+    counted in stats['backfilled'] instead).
+    """
+    start = time.monotonic()
+    deadline = start + time_budget
+    domain = registered_domain(base_url)
+    site = domain if incremental else None
+    known = crawl_state.known_urls(site) if site else set()
+    counter = itertools.count()
+    frontier = []
+    seen = {}  # canonical URL -> first URL queued for it
+    duplicate_urls = 0
+    near_duplicates = NearDuplicateFilter()
+
+    def push(url, anchor='', bonus=0.0):
+        nonlocal duplicate_urls
+        url = normalize_url(url)
+        # Locale variants and paginated listings share a canonical key; the canonical form itself is what
+        # gets fetched (/en/about -> /about, /news/page/2 -> /news), once, whichever variant turned up first
+        key = canonical_url(url)
+        if key in seen:
+            if url != seen[key]:
+                duplicate_urls += 1
+            return
+        variant, url = url, normalize_url(canonical_url(url, keep_host=True))
+        if variant in lastmods and url not in lastmods:
+            lastmods[url] = lastmods[variant]
+        if registered_domain(url) != domain or urlparse(url).path.lower().endswith(SKIP_EXTENSIONS):
+            return
+        if not url_discovery.get_site_rules(url).can_fetch(url):
+            return
+        seen[key] = url
+        score = score_url(url, anchor) + bonus
+        if score >= CRAWL_MIN_SCORE:
+            heapq.heappush(frontier, (-score, next(counter), url))
+
+    lastmods = {normalize_url(u): lastmod for u, lastmod in url_discovery.discover_urls(base_url).items()}
+    push(base_url, bonus=100)  # the homepage is always fetched first
+    home_url = seen.get(canonical_url(normalize_url(base_url)))
+    for seed in itertools.chain(seeds or [], list(lastmods)):
+        push(seed)
+
+    pages, pdf_texts = [], []
+    changed_urls = []
+    statuses = {'reused': 0, 'new': 0, 'changed': 0, 'unchanged': 0, 'backfilled': 0}
+    collected = 0
+    fetched = 0
+    in_flight = {}
+    pool = ThreadPoolExecutor(max_workers=CRAWL_CONCURRENCY + 2, thread_name_prefix='frontier')
+    try:
+        while (frontier or in_flight) and collected < text_budget and fetched < CRAWL_SAFETY_MAX_PAGES:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            while frontier and len(in_flight) < CRAWL_CONCURRENCY and fetched + len(in_flight) < CRAWL_SAFETY_MAX_PAGES:
+                neg_score, _, url = heapq.heappop(frontier)
+                is_pdf = urlparse(url).path.lower().endswith('.pdf')
+                if is_pdf and not pdf_fetcher:
+                    continue
+                if is_pdf:
+                    future = pool.submit(pdf_fetcher, url)
+                else:
+                    future = pool.submit(_fetch_page, url, deadline, site, lastmods.get(url) or None)
+                in_flight[future] = (url, -neg_score, is_pdf)
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                url, score, is_pdf = in_flight.pop(future)
+                fetched += 1
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logging.info(f"[crawl_frontier] Failed {url}: {e}")
+                    continue
+                if is_pdf:
+                    text = (result or '')[:PAGE_TEXT_LIMIT]
+                    if text and not near_duplicates.is_duplicate(text):
+                        pdf_texts.append(text)
+                        collected += len(text)
+                    continue
+                final_url = result['final_url'] or url
+                if url == home_url and registered_domain(final_url):
+                    # Follow the homepage if it redirects to another registered domain
+                    domain = registered_domain(final_url)
+                if result['status'] == 'new' and url in known:
+                    result['status'] = 'backfilled'
+                if result['status'] in statuses:
+                    statuses[result['status']] += 1
+                if result['status'] in ('new', 'changed'):
+                    changed_urls.append(url)
+                text = result['text']
+                if text and not near_duplicates.is_duplicate(text):
+                    pages.append({'url': url, 'text': text, 'score': score})
+                    collected += len(text)
+                for link, anchor in result['links']:
+                    push(link, anchor)
+    finally:
+        # Whatever is still queued or rendering is past the budget; drop it
+        for future in in_flight:
+            future.cancel()
+        pool.shutdown(wait=False, cancel_futures=True)
+    if site:
+        crawl_state.remember_urls(site, seen.values())
+    pages.sort(key=lambda p: -p['score'])
+    stats = {
+        'fetched': fetched,
+        'chars': collected,
+        'elapsed': round(time.monotonic() - start, 1),
+        'unvisited': len(frontier),
+        'duplicate_urls': duplicate_urls,
+        'duplicate_pages': near_duplicates.dropped,
+        **statuses,
+    }
+    return {'pages': pages, 'pdf_texts': pdf_texts, 'changed_urls': changed_urls, 'stats': stats}
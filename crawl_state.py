@@ -0,0 +1,114 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import http_client
+from disk_cache import CACHE_DIR
+
+# --- CONFIG ---
+RECRAWL_MAX_AGE = int(os.getenv('RECRAWL_MAX_AGE', 30 * 86400))  # re-render stored pages at least this often
+
+_lock = threading.Lock()
+_conn = None
+
+def _db():
+    global _conn
+    if _conn is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        _conn = sqlite3.connect(os.path.join(CACHE_DIR, 'crawl_state.sqlite'), timeout=30, check_same_thread=False)
+        with _conn:
+            _conn.execute("PRAGMA journal_mode=WAL")
+            _conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "domain TEXT, url TEXT, final_url TEXT, content_hash TEXT, etag TEXT, last_modified TEXT, lastmod TEXT, "
+                "text TEXT, links TEXT, fetched_at REAL, PRIMARY KEY (domain, url))"
+            )
+            # Every URL a crawl queued or skipped, fetched or not, so a later crawl can tell a page that
+            # appeared on the site from one an earlier, budget-limited crawl simply did not reach
+            _conn.execute(
+                "CREATE TABLE IF NOT EXISTS seen_urls (domain TEXT, url TEXT, first_seen REAL, PRIMARY KEY (domain, url))"
+            )
+    return _conn
+
+def content_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def get_page(domain, url):
+    with _lock:
+        row = _db().execute(
+            "SELECT final_url, content_hash, etag, last_modified, lastmod, text, links, fetched_at "
+            "FROM pages WHERE domain = ? AND url = ?",
+            (domain, url),
+        ).fetchone()
+    if row is None:
+        return None
+    keys = ('final_url', 'content_hash', 'etag', 'last_modified', 'lastmod', 'text', 'links', 'fetched_at')
+    page = dict(zip(keys, row))
+    page['links'] = [tuple(link) for link in json.loads(page['links'] or '[]')]
+    return page
+
+def save_page(domain, url, text, links, final_url=None, headers=None, lastmod=None):
+    """Store a freshly rendered page. Returns 'new', 'changed' or 'unchanged' against the previous crawl."""
+    headers = {k.lower(): v for k, v in (headers or {}).items()}
+    previous = get_page(domain, url)
+    digest = content_hash(text)
+    with _lock, _db():
+        _db().execute(
+            "INSERT OR REPLACE INTO pages "
+            "(domain, url, final_url, content_hash, etag, last_modified, lastmod, text, links, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (domain, url, final_url or url, digest, headers.get('etag'), headers.get('last-modified'), lastmod,
+             text, json.dumps(list(links)), time.time()),
+        )
+    if previous is None:
+        return 'new'
+    return 'unchanged' if previous['content_hash'] == digest else 'changed'
+
+def known_urls(domain):
+    """URLs of domain that an earlier crawl stored or saw linked; empty before the first crawl."""
+    with _lock:
+        rows = _db().execute(
+            "SELECT url FROM pages WHERE domain = ? UNION SELECT url FROM seen_urls WHERE domain = ?",
+            (domain, domain),
+        ).fetchall()
+    return {row[0] for row in rows}
+
+def remember_urls(domain, urls):
+    now = time.time()
+    with _lock, _db():
+        _db().executemany(
+            "INSERT OR IGNORE INTO seen_urls (domain, url, first_seen) VALUES (?, ?, ?)",
+            [(domain, url, now) for url in urls],
+        )
+
+def _touch(domain, url, lastmod=None):
+    with _lock, _db():
+        _db().execute(
+            "UPDATE pages SET fetched_at = ?, lastmod = COALESCE(?, lastmod) WHERE domain = ? AND url = ?",
+            (time.time(), lastmod, domain, url),
+        )
+
+def reusable_page(domain, url, lastmod=None):
+    """
+    The stored page if it is known to be unchanged: the sitemap lastmod is not newer than the stored one,
+    or a HEAD request still returns the stored ETag / Last-Modified. None means the page must be rendered.
+    """
+    page = get_page(domain, url)
+    if page is None or time.time() - (page['fetched_at'] or 0) > RECRAWL_MAX_AGE:
+        return None
+    if lastmod and page['lastmod'] and lastmod <= page['lastmod']:
+        return page
+    if page['etag'] or page['last_modified']:
+        try:
+            resp = http_client.head(url, timeout=5)
+        except Exception:
+            return None
+        if page['etag'] and resp.headers.get('etag') == page['etag']:
+            _touch(domain, url, lastmod)
+            return page
+        if not page['etag'] and page['last_modified'] and resp.headers.get('last-modified') == page['last_modified']:
+            _touch(domain, url, lastmod)
+            return page
+    return None
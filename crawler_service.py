@@ -0,0 +1,145 @@
+import os
+import asyncio
+import atexit
+import logging
+import threading
+from crawl4ai import AsyncWebCrawler, BrowserConfig
+
+# --- CONFIG ---
+CRAWLER_POOL_SIZE = int(os.getenv('CRAWLER_POOL_SIZE', 2))  # warm browsers kept open
+CRAWLER_PAGES_PER_BROWSER = int(os.getenv('CRAWLER_PAGES_PER_BROWSER', 3))  # concurrent pages per browser
+CRAWLER_MAX_CONCURRENT_PAGES = int(os.getenv('CRAWLER_MAX_CONCURRENT_PAGES', 6))  # across the whole pool
+CRAWLER_RECYCLE_AFTER = int(os.getenv('CRAWLER_RECYCLE_AFTER', 50))  # pages served before a browser is replaced
+CRAWLER_QUEUE_LIMIT = int(os.getenv('CRAWLER_QUEUE_LIMIT', 200))  # queued + running jobs
+
+_service = None
+_service_lock = threading.Lock()
+
+class _BrowserSlot:
+    def __init__(self, crawler):
+        self.crawler = crawler
+        self.active = 0
+        self.served = 0
+        self.retiring = False
+
+class CrawlerService:
+    """
+    Process-wide pool of warm crawl4ai browsers running on a dedicated background event loop.
+    Synchronous code submits jobs with submit() and gets a concurrent.futures.Future back; jobs queue
+    for a page slot (CRAWLER_MAX_CONCURRENT_PAGES) and run on the least busy browser. A browser is
+    closed and relaunched once it has served CRAWLER_RECYCLE_AFTER pages, to bound memory.
+    """
+
+    def __init__(self, pool_size=CRAWLER_POOL_SIZE):
+        self.pool_size = pool_size
+        self._slots = []
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._startup_error = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name='crawler-service', daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start_pool(), self._loop).result()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    async def _start_pool(self):
+        self._pages = asyncio.Semaphore(CRAWLER_MAX_CONCURRENT_PAGES)
+        self._changed = asyncio.Condition()
+        # Browsers launch in the background so the first job only waits for the first browser
+        for _ in range(self.pool_size):
+            self._loop.create_task(self._add_browser())
+
+    async def _launch(self):
+        crawler = AsyncWebCrawler(config=BrowserConfig(headless=True, verbose=False))
+        await crawler.start()
+        return _BrowserSlot(crawler)
+
+    async def _add_browser(self):
+        try:
+            slot = await self._launch()
+        except Exception as e:
+            logging.error(f"[crawler_service] Browser launch failed: {e}")
+            self._startup_error = e
+            slot = None
+        async with self._changed:
+            if slot:
+                self._slots.append(slot)
+            self._changed.notify_all()
+
+    async def _retire(self, slot):
+        try:
+            await slot.crawler.close()
+        except Exception as e:
+            logging.warning(f"[crawler_service] Error closing browser: {e}")
+        await self._add_browser()
+
+    async def _acquire(self):
+        async with self._changed:
+            while True:
+                ready = [s for s in self._slots if not s.retiring and s.active < CRAWLER_PAGES_PER_BROWSER]
+                if ready:
+                    slot = min(ready, key=lambda s: s.active)
+                    slot.active += 1
+                    return slot
+                if not self._slots and self._startup_error is not None:
+                    raise RuntimeError(f"No crawler browser available: {self._startup_error}")
+                await self._changed.wait()
+
+    async def _release(self, slot):
+        async with self._changed:
+            slot.active -= 1
+            slot.served += 1
+            if slot.served >= CRAWLER_RECYCLE_AFTER:
+                slot.retiring = True
+            if slot.retiring and slot.active == 0 and slot in self._slots:
+                self._slots.remove(slot)
+                self._loop.create_task(self._retire(slot))
+            self._changed.notify_all()
+
+    async def _crawl(self, url, kwargs):
+        try:
+            async with self._pages:
+                slot = await self._acquire()
+                try:
+                    return await slot.crawler.arun(url=url, **kwargs)
+                finally:
+                    await self._release(slot)
+        finally:
+            with self._pending_lock:
+                self._pending -= 1
+
+    def submit(self, url, **arun_kwargs):
+        """Queue a crawl of url (arun keyword arguments are passed through); returns a concurrent.futures.Future."""
+        with self._pending_lock:
+            if self._pending >= CRAWLER_QUEUE_LIMIT:
+                raise RuntimeError("Crawler queue is full")
+            self._pending += 1
+        return asyncio.run_coroutine_threadsafe(self._crawl(url, arun_kwargs), self._loop)
+
+    async def _close_all(self):
+        async with self._changed:
+            slots, self._slots = self._slots, []
+        for slot in slots:
+            try:
+                await slot.crawler.close()
+            except Exception:
+                pass
+
+    def shutdown(self):
+        asyncio.run_coroutine_threadsafe(self._close_all(), self._loop).result(timeout=30)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+def get_crawler_service():
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = CrawlerService()
+                atexit.register(_service.shutdown)
+    return _service
+
+def submit_crawl(url, **arun_kwargs):
+    return get_crawler_service().submit(url, **arun_kwargs)
@@ -0,0 +1,87 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+import zlib
+
+# --- CONFIG ---
+CACHE_DIR = os.getenv('PREP_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache'))
+
+class DiskCache:
+    """
+    Small persistent key/value store backed by one SQLite file under CACHE_DIR.
+    Each entry holds a bytes value plus a JSON metadata dict, an optional expiry and a last-access time;
+    when max_bytes is set the least recently used entries are evicted to stay under it.
+    Safe to share between threads and between processes (WAL mode).
+    """
+
+    def __init__(self, name, max_bytes=None, compress=False):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        self.path = os.path.join(CACHE_DIR, f"{name}.sqlite")
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB, meta TEXT, size INTEGER, "
+                "expires_at REAL, accessed_at REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+
+    def get(self, key):
+        """Return (value, meta) for a live entry, or None if missing or expired."""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, meta, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, meta, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        if self.compress and value:
+            value = zlib.decompress(value)
+        return value, json.loads(meta or '{}')
+
+    def set(self, key, value=b'', meta=None, ttl=None):
+        if self.compress and value:
+            value = zlib.compress(value, 6)
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, meta, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, value, json.dumps(meta or {}), len(value or b''), expires_at, now),
+            )
+            if self.max_bytes:
+                self._evict()
+
+    def delete(self, key):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def get_json(self, key):
+        hit = self.get(key)
+        return json.loads(hit[0]) if hit else None
+
+    def set_json(self, key, obj, ttl=None):
+        self.set(key, json.dumps(obj).encode('utf-8'), ttl=ttl)
+
+    def _evict(self):
+        # Caller holds the lock and an open transaction
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall():
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
@@ -0,0 +1,181 @@
+import re
+import logging
+import fitz  # PyMuPDF
+from disk_cache import DiskCache
+from pdf_parser import extract_financial_pages, content_key, run_in_pool
+
+# --- CONFIG ---
+TABLES_VERSION = 3  # bump when the label map, parsing or pdf_parser's page selection changes
+# Row label patterns for each metric; the first metric whose pattern matches a row label wins
+METRIC_LABELS = {
+    'Revenue': r'^(?:total\s+)?revenue(?:s)?(?:\s+from\s+operations)?\b|^turnover\b|^net\s+sales\b',
+    'Total Income': r'^total\s+income\b',
+    'EBITDA': r'^ebitda\b',
+    'Operating Margin': r'^(?:operating|ebit|ebitda)\s+margin\b',
+    'Net Profit': r'^net\s+(?:profit|income)\b|^profit\s+after\s+tax\b|^pat\b|^profit\s+for\s+the\s+(?:year|period)\b',
+    'EPS': r'^(?:basic\s+|diluted\s+)?(?:earnings\s+per\s+(?:equity\s+)?share|eps)\b',
+    'Total Assets': r'^total\s+assets\b',
+}
+METRIC_PATTERNS = {metric: re.compile(pat, re.IGNORECASE) for metric, pat in METRIC_LABELS.items()}
+QUARTER = re.compile(r"\bQ([1-4])\s*'?\s*(?:FY)?\s*'?(\d{2,4})\b", re.IGNORECASE)
+FISCAL_YEAR = re.compile(r"\bFY\s*'?((?:19|20)?\d{2})(?:\s*[-–/]\s*(\d{2,4}))?\b", re.IGNORECASE)
+YEAR_RANGE = re.compile(r"\b((?:19|20)\d{2})\s*[-–/]\s*(\d{2})\b")
+YEAR = re.compile(r"\b((?:19|20)\d{2})\b")
+NUMBER = re.compile(r"^\(?\s*-?[\d,]*\.?\d+\s*\)?%?$")
+# Statement unit notes: '(₹ in crore)', 'In ₹ Crores', 'Rs. in lakhs', '(in millions, except per share data)'
+CURRENCY = r"(₹|rs\.?|inr|us\$|\$|usd|€|eur)"
+UNIT = re.compile(rf"(?:{CURRENCY}\s*)?\bin\s+(?:{CURRENCY}\s*)?(crore|lakh|lac|million|billion|thousand)s?\b", re.IGNORECASE)
+CURRENCY_SYMBOLS = {'₹': '₹', 'rs': '₹', 'rs.': '₹', 'inr': '₹', 'us$': '$', '$': '$', 'usd': '$', '€': '€', 'eur': '€'}
+UNITLESS_METRICS = {'EPS', 'Operating Margin'}  # per-share and percentage rows ignore the statement's unit
+
+_cache = None
+
+def _get_cache():
+    global _cache
+    if _cache is None:
+        _cache = DiskCache('financial_tables')
+    return _cache
+
+def _full_year(yy):
+    return yy if len(yy) == 4 else f"20{yy[-2:]}"
+
+def parse_period(cell):
+    """'Q1 FY26' -> 'Q1 FY2026', 'FY 2023-24' / '2023-24' -> 'FY2024', 'March 31, 2024' -> '2024'; None otherwise."""
+    cell = (cell or '').replace('\n', ' ')
+    m = QUARTER.search(cell)
+    if m:
+        return f"Q{m.group(1)} FY{_full_year(m.group(2))}"
+    m = FISCAL_YEAR.search(cell)
+    if m:
+        return f"FY{_full_year(m.group(2) or m.group(1))}"
+    m = YEAR_RANGE.search(cell)
+    if m:
+        return f"FY{_full_year(m.group(2))}"
+    years = YEAR.findall(cell)
+    return years[-1] if years else None
+
+def parse_number(cell):
+    """'1,234.5' -> 1234.5, '(12.0)' -> -12.0, '18.2%' -> 18.2; None for text, dashes and blanks."""
+    cell = (cell or '').strip().replace('−', '-').replace('₹', '').replace('$', '').replace('€', '').strip()
+    if not cell or not NUMBER.match(cell):
+        return None
+    negative = cell.startswith('(') or cell.startswith('-')
+    value = float(re.sub(r'[^\d.]', '', cell))
+    return -value if negative else value
+
+def parse_unit(text):
+    """First statement unit note in text: '(₹ in crore)' -> '₹ crore', '(in millions)' -> 'million'; None if absent."""
+    m = UNIT.search(text or '')
+    if not m:
+        return None
+    currency = CURRENCY_SYMBOLS.get((m.group(1) or m.group(2) or '').lower())
+    scale = 'lakh' if m.group(3).lower() == 'lac' else m.group(3).lower()
+    return f"{currency} {scale}" if currency else scale
+
+def _match_metric(label):
+    label = re.sub(r'^[\W\d]+', '', (label or '').replace('\n', ' ')).strip()
+    for metric, pattern in METRIC_PATTERNS.items():
+        if pattern.search(label):
+            return metric
+    return None
+
+def _fill_periods(header, cells):
+    """Statements list years newest first: a clipped header cell right of 'FY2024' is read as 'FY2023'."""
+    filled = list(header)
+    for i in range(2, len(filled)):
+        prev = filled[i - 1]
+        if not filled[i] and prev and cells[i].strip() and re.fullmatch(r'(FY)?\d{4}', prev):
+            filled[i] = re.sub(r'\d{4}', lambda m: str(int(m.group()) - 1), prev)
+    return filled
+
+def _rows_to_metrics(rows, metrics):
+    """Fold one table's rows into metrics {metric: {period: value}}; periods come from the nearest header row."""
+    periods = None
+    for row in rows:
+        cells = [c or '' for c in row]
+        metric = _match_metric(next((c for c in cells if c.strip()), ''))
+        header = [parse_period(c) for c in cells]
+        if not metric and any(header[1:]) and not any(parse_number(c) is not None and not p for c, p in zip(cells[1:], header[1:])):
+            periods = _fill_periods(header, cells)
+            continue
+        if not metric:
+            continue
+        values = metrics.setdefault(metric, {})
+        for i, cell in enumerate(cells[1:], start=1):
+            value = parse_number(cell)
+            if value is None:
+                continue
+            period = (periods[i] if periods and i < len(periods) else None) or f"col{i}"
+            values.setdefault(period, value)
+
+def _extract_tables(source, pages):
+    """
+    Worker: detect tables on the given 1-based pages (ruled tables first, then text-aligned) and map them.
+    Returns (metrics, units): each metric takes the unit note of the page it was first found on.
+    """
+    metrics, units = {}, {}
+    with fitz.open(stream=source, filetype="pdf") if isinstance(source, (bytes, bytearray)) else fitz.open(source) as doc:
+        for number in pages:
+            if not 0 < number <= doc.page_count:
+                continue
+            page = doc.load_page(number - 1)
+            try:
+                tables = page.find_tables().tables or page.find_tables(strategy='text').tables
+            except Exception as e:
+                logging.info(f"[financial_tables] Table detection failed on page {number}: {e}")
+                continue
+            for table in tables:
+                _rows_to_metrics(table.extract(), metrics)
+            unit = parse_unit(page.get_text()) if tables else None
+            for metric, values in metrics.items():
+                if unit and values and metric not in units and metric not in UNITLESS_METRICS:
+                    units[metric] = unit
+    return {metric: values for metric, values in metrics.items() if values}, units
+
+def _tables_and_units(source):
+    key = content_key(source, 'tables', TABLES_VERSION)
+    hit = _get_cache().get_json(key)
+    if hit is not None:
+        return hit['tables'], hit['units']
+    pages = extract_financial_pages(source)['pages']
+    tables, units = run_in_pool(_extract_tables, source, pages) if pages else ({}, {})
+    _get_cache().set_json(key, {'tables': tables, 'units': units})
+    return tables, units
+
+def extract_financial_tables(source):
+    """
+    Financial statement tables of a PDF (path or bytes) as typed values by period, e.g.
+    {'Revenue': {'FY2024': 45210.0, 'FY2023': 40110.0}, 'Net Profit': {...}}. Only the pages chosen by
+    pdf_parser.extract_financial_pages are scanned. Columns without a recognisable period header are
+    keyed 'col1', 'col2', ... in table order. Returns {} when no statement table is found.
+    """
+    return _tables_and_units(source)[0]
+
+def table_units(source):
+    """{metric: unit} from the statements' unit notes, e.g. {'Revenue': '₹ crore'}; metrics without a note are left out."""
+    return _tables_and_units(source)[1]
+
+def _period_order(period):
+    # Latest first: FY2025 > Q4 FY2025 > ... ; unlabeled columns keep table order (first column is usually current)
+    m = re.search(r'(\d{4})', period)
+    if not m:
+        return (0, -int(re.sub(r'\D', '', period) or 0))
+    quarter = re.match(r'Q([1-4])', period)
+    return (int(m.group(1)), int(quarter.group(1)) if quarter else 5)
+
+def latest_financials(tables):
+    """{metric: value} for the most recent period of each metric in extract_financial_tables output."""
+    return {metric: values[max(values, key=_period_order)] for metric, values in tables.items() if values}
+
+def financials_from_pdf(source):
+    """
+    Latest value per metric from the PDF's statement tables, keyed with the unit when the statement gives one
+    ('Revenue (₹ crore)'); {} when there are none (callers may then fall back to the LLM).
+    """
+    try:
+        tables, units = _tables_and_units(source)
+    except Exception as e:
+        logging.error(f"[financial_tables] Table extraction failed: {e}")
+        return {}
+    return {f"{metric} ({units[metric]})" if metric in units else metric: value
+            for metric, value in latest_financials(tables).items()}
@@ -0,0 +1,274 @@
+import os
+import re
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urljoin
+
+try:
+    import lxml.html
+    from lxml import etree
+    HAVE_LXML = True
+except ImportError:  # BeautifulSoup with html.parser is the fallback
+    HAVE_LXML = False
+from bs4 import BeautifulSoup
+from bs4.element import NavigableString, PreformattedString
+
+# --- CONFIG ---
+HTML_PROCESS_THRESHOLD = int(os.getenv('HTML_PROCESS_THRESHOLD', 1024 * 1024))  # bytes; bigger pages parse in a worker process
+HTML_PROCESS_WORKERS = int(os.getenv('HTML_PROCESS_WORKERS', 2))
+# Strings inside these are not page text (BeautifulSoup leaves them out of get_text / stripped_strings too)
+NON_TEXT_TAGS = {'script', 'style', 'template'}
+CHROME_TAGS = ('nav', 'footer', 'script', 'style', 'aside', 'form')  # extract_main_text
+PARAGRAPH_NOISE_TAGS = ('script', 'style', 'nav', 'header', 'footer', 'aside')  # fetch_text_from_url
+PARAGRAPH_TAGS = ('p', 'li', 'h1', 'h2', 'h3')
+# Elements that start a new text block; anything else (span, a, strong, ...) is inline and joins its block
+BLOCK_TAGS = {'p', 'li', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'td', 'th', 'dd', 'dt', 'tr', 'ul', 'ol', 'dl',
+              'table', 'section', 'article', 'header', 'footer', 'nav', 'aside', 'main', 'blockquote', 'figcaption',
+              'address', 'body'}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# --- lxml fast path ---
+def _parse(html):
+    if isinstance(html, str):
+        html = html.encode('utf-8', 'replace')
+    if not html.strip():
+        return None
+    if not html.lstrip().startswith(b'<'):
+        # libxml2 wraps leading bare text in an implied <p>; html.parser keeps it outside any tag
+        html = b'<body>' + html
+    try:
+        return lxml.html.document_fromstring(html, parser=lxml.html.HTMLParser(encoding='utf-8'))
+    except (etree.ParserError, ValueError):
+        return None
+
+def _drop(doc, tags):
+    for el in list(doc.iter(*tags)):
+        if el.getparent() is not None:
+            el.drop_tree()  # keeps the tail text, like BeautifulSoup's decompose
+
+def _strings(el):
+    """Text nodes of el in document order, skipping script/style/template and comments (as BeautifulSoup does)."""
+    skipping = 0
+    for event, node in etree.iterwalk(el, events=('start', 'end')):
+        is_element = isinstance(node.tag, str)
+        if event == 'start':
+            if is_element and node.tag in NON_TEXT_TAGS:
+                skipping += 1
+            elif is_element and not skipping and node.text:
+                yield node.text
+        else:
+            if is_element and node.tag in NON_TEXT_TAGS:
+                skipping -= 1
+            if node is not el and not skipping and node.tail:
+                yield node.tail
+
+def _stripped(el):
+    return [s.strip() for s in _strings(el) if s.strip()]
+
+def _lxml_main_text(html, limit):
+    doc = _parse(html)
+    if doc is None:
+        return ""
+    _drop(doc, CHROME_TAGS)
+    text = "\n".join(_stripped(doc))
+    return re.sub(r"\n\s*\n", "\n\n", text)[:limit]
+
+def _lxml_paragraph_text(html):
+    doc = _parse(html)
+    if doc is None:
+        return ""
+    _drop(doc, PARAGRAPH_NOISE_TAGS)
+    text = ' '.join(''.join(_strings(el)).strip() for el in doc.iter(*PARAGRAPH_TAGS))
+    return re.sub(r'\s+', ' ', text)
+
+def _lxml_all_text(html):
+    doc = _parse(html)
+    return "\n".join(_stripped(doc)) if doc is not None else ""
+
+def _lxml_element_texts(html, tags):
+    doc = _parse(html)
+    if doc is None:
+        return []
+    return [" ".join(_stripped(el)) for el in doc.iter(*tags)]
+
+def _lxml_text_blocks(html):
+    doc = _parse(html)
+    if doc is None:
+        return []
+    # Each block reserves its slot when it opens so the output follows document order
+    blocks, stack, skipping = [], [], 0
+    for event, node in etree.iterwalk(doc, events=('start', 'end')):
+        tag = node.tag if isinstance(node.tag, str) else None
+        if event == 'start':
+            if tag in NON_TEXT_TAGS:
+                skipping += 1
+                continue
+            if skipping:
+                continue
+            if tag in BLOCK_TAGS or not stack:
+                blocks.append(None)
+                stack.append((len(blocks) - 1, []))
+            if tag and node.text and node.text.strip():
+                stack[-1][1].append(node.text.strip())
+            continue
+        if tag in NON_TEXT_TAGS:
+            skipping -= 1
+        elif not skipping and (tag in BLOCK_TAGS or node is doc):
+            index, parts = stack.pop()
+            blocks[index] = " ".join(parts)
+        if not skipping and node is not doc and node.tail and node.tail.strip():
+            stack[-1][1].append(node.tail.strip())
+    return [block for block in blocks if block]
+
+def _lxml_links(html, base_url):
+    doc = _parse(html)
+    if doc is None:
+        return []
+    return [(urljoin(base_url, a.get('href')) if base_url else a.get('href'), " ".join(_stripped(a)))
+            for a in doc.iter('a') if a.get('href') is not None]
+
+def _lxml_infobox_rows(html):
+    doc = _parse(html)
+    if doc is None:
+        return []
+    rows = []
+    tables = [t for t in doc.iter('table') if 'infobox' in (t.get('class') or '').split()]
+    for row in (tables[0].iter('tr') if tables else []):
+        header = next(row.iter('th'), None)
+        cell = next(row.iter('td'), None)
+        rows.append(("".join(_strings(header)) if header is not None else "", _stripped(cell) if cell is not None else []))
+    return rows
+
+# --- BeautifulSoup fallback (the original html.parser code paths) ---
+def _soup(html):
+    return BeautifulSoup(html, "html.parser")
+
+def _bs4_main_text(html, limit):
+    soup = _soup(html)
+    for tag in soup(list(CHROME_TAGS)):
+        tag.decompose()
+    text = soup.get_text(separator="\n", strip=True)
+    return re.sub(r"\n\s*\n", "\n\n", text)[:limit]
+
+def _bs4_paragraph_text(html):
+    soup = _soup(html)
+    for tag in soup(list(PARAGRAPH_NOISE_TAGS)):
+        tag.decompose()
+    text = ' '.join(p.get_text().strip() for p in soup.find_all(list(PARAGRAPH_TAGS)))
+    return re.sub(r'\s+', ' ', text)
+
+def _bs4_all_text(html):
+    return "\n".join(_soup(html).stripped_strings)
+
+def _bs4_element_texts(html, tags):
+    return [tag.get_text(" ", strip=True) for tag in _soup(html).find_all(list(tags))]
+
+def _bs4_text_blocks(html):
+    blocks = []  # slots are reserved when a block opens, so the output follows document order
+
+    def walk(tag, parts):
+        for child in tag.children:
+            if isinstance(child, PreformattedString):  # comments, doctype, CDATA
+                continue
+            if isinstance(child, NavigableString):
+                if child.strip():
+                    parts.append(child.strip())
+            elif child.name in NON_TEXT_TAGS:
+                continue
+            elif child.name in BLOCK_TAGS:
+                index, own = len(blocks), []
+                blocks.append(None)
+                walk(child, own)
+                blocks[index] = " ".join(own)
+            else:
+                walk(child, parts)
+
+    blocks.append(None)
+    top = []
+    walk(_soup(html), top)
+    blocks[0] = " ".join(top)
+    return [block for block in blocks if block]
+
+def _bs4_links(html, base_url):
+    return [(urljoin(base_url, a['href']) if base_url else a['href'], a.get_text(" ", strip=True))
+            for a in _soup(html).find_all('a', href=True)]
+
+def _bs4_infobox_rows(html):
+    infobox = _soup(html).find('table', {'class': 'infobox'})
+    rows = []
+    for row in (infobox.find_all('tr') if infobox else []):
+        header = row.find('th')
+        cell = row.find('td')
+        rows.append((header.text if header else "", list(cell.stripped_strings) if cell else []))
+    return rows
+
+_IMPLEMENTATIONS = {
+    'main_text': (_lxml_main_text, _bs4_main_text),
+    'paragraph_text': (_lxml_paragraph_text, _bs4_paragraph_text),
+    'all_text': (_lxml_all_text, _bs4_all_text),
+    'element_texts': (_lxml_element_texts, _bs4_element_texts),
+    'text_blocks': (_lxml_text_blocks, _bs4_text_blocks),
+    'links': (_lxml_links, _bs4_links),
+    'infobox_rows': (_lxml_infobox_rows, _bs4_infobox_rows),
+}
+
+def _run(name, html, *args):
+    fast, fallback = _IMPLEMENTATIONS[name]
+    return (fast if HAVE_LXML else fallback)(html, *args)
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # Workers start from a clean forkserver process rather than a fork of this multi-threaded one
+                _pool = ProcessPoolExecutor(max_workers=HTML_PROCESS_WORKERS, mp_context=multiprocessing.get_context('forkserver'))
+    return _pool
+
+def _dispatch(name, html, *args):
+    """Small pages parse in the calling thread; pages over HTML_PROCESS_THRESHOLD go to a worker process."""
+    html = html or ""
+    if HTML_PROCESS_WORKERS > 0 and len(html) > HTML_PROCESS_THRESHOLD:
+        return _get_pool().submit(_run, name, html, *args).result()
+    return _run(name, html, *args)
+
+# --- public API ---
+# On well-formed markup each function returns what the BeautifulSoup html.parser code it replaced returned.
+# Malformed markup is repaired differently: lxml follows the HTML rules browsers use and closes an open <p>
+# before a block element (<p>a<div>b</div>c</p> is p "a", div "b", loose "c") and closes an unclosed <p>/<li>
+# at the next one, where html.parser nests everything inside the first element, so paragraph_text and
+# text_blocks can split or order such text differently (without the repeated text html.parser produces).
+def main_text(html, limit=5000):
+    """Page text without nav/footer/aside/form chrome, one string per line, blank runs collapsed, capped at limit."""
+    return _dispatch('main_text', html, limit)
+
+def paragraph_text(html):
+    """Text of p/li/h1-h3 elements joined by spaces, whitespace collapsed; header/nav/footer/aside removed."""
+    return _dispatch('paragraph_text', html)
+
+def all_text(html):
+    """Every visible string of the page, stripped, one per line."""
+    return _dispatch('all_text', html)
+
+def element_texts(html, tags):
+    """For each element with one of tags, in document order: its stripped strings joined by spaces."""
+    return _dispatch('element_texts', html, tuple(tags))
+
+def text_blocks(html):
+    """
+    The page's text grouped by block element (p, li, div, td, h*, ...) in one pass over the tree, in document
+    order. Each block holds only its own text and that of its inline children (span, a, strong, ...);
+    nested blocks are separate entries, so no text is repeated.
+    """
+    return _dispatch('text_blocks', html)
+
+def links(html, base_url=None):
+    """[(href, anchor text)] for every <a href>; hrefs are made absolute when base_url is given."""
+    return _dispatch('links', html, base_url)
+
+def infobox_rows(html):
+    """Rows of the first Wikipedia-style table.infobox as (header text, [stripped strings of the first cell])."""
+    return _dispatch('infobox_rows', html)
@@ -0,0 +1,143 @@
+import os
+import time
+import hashlib
+import logging
+from email.utils import parsedate_to_datetime
+import httpx
+from disk_cache import DiskCache
+
+# --- CONFIG ---
+HTTP_CACHE_MAX_BYTES = int(os.getenv('HTTP_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+HTTP_CACHE_MAX_ENTRY_BYTES = int(os.getenv('HTTP_CACHE_MAX_ENTRY_BYTES', 50 * 1024 * 1024))
+# Request headers that change the representation and therefore belong in the cache key
+KEY_HEADERS = ('accept', 'accept-language', 'user-agent')
+# Response headers that describe the wire encoding, not the (already decoded) body we store
+DROP_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'connection'}
+
+_cache = None
+
+def _get_cache():
+    global _cache
+    if _cache is None:
+        _cache = DiskCache('http', max_bytes=HTTP_CACHE_MAX_BYTES)
+    return _cache
+
+def cache_key(url, headers):
+    parts = [str(url)] + [f"{h}:{headers.get(h, '')}" for h in KEY_HEADERS]
+    return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+def _cache_control(headers):
+    directives = {}
+    for part in headers.get('cache-control', '').lower().split(','):
+        name, _, value = part.strip().partition('=')
+        if name:
+            directives[name] = value.strip('"')
+    return directives
+
+def freshness_deadline(headers, now):
+    """Absolute time until which a response may be served without revalidation (RFC 9111 for a private cache)."""
+    cc = _cache_control(headers)
+    if 'no-cache' in cc:
+        return now
+    if 'max-age' in cc:
+        try:
+            return now + int(cc['max-age']) - int(headers.get('age', 0) or 0)
+        except ValueError:
+            return now
+    try:
+        if 'expires' in headers:
+            expires = parsedate_to_datetime(headers['expires']).timestamp()
+            date = parsedate_to_datetime(headers['date']).timestamp() if 'date' in headers else now
+            return now + (expires - date)
+        if 'last-modified' in headers:
+            # Heuristic freshness: 10% of the time since the resource last changed, capped at a day
+            modified = parsedate_to_datetime(headers['last-modified']).timestamp()
+            return now + min(max(0, now - modified) * 0.1, 86400)
+    except (TypeError, ValueError):
+        pass
+    return now
+
+def _storable(response, body):
+    cc = _cache_control(response.headers)
+    if 'no-store' in cc or response.headers.get('vary', '').strip() == '*':
+        return False
+    return len(body) <= HTTP_CACHE_MAX_ENTRY_BYTES
+
+def _from_cache(body, meta):
+    return httpx.Response(
+        status_code=meta['status'],
+        headers=meta['headers'],
+        content=body,
+        request=httpx.Request('GET', meta['url']),
+    )
+
+def store(key, response, body=None, now=None):
+    """Cache a 200 response; body is passed when the response was streamed and its content read elsewhere."""
+    body = response.content if body is None else body
+    now = time.time() if now is None else now
+    if response.status_code != 200 or not _storable(response, body):
+        return
+    headers = {k: v for k, v in response.headers.items() if k.lower() not in DROP_HEADERS}
+    meta = {
+        'url': str(response.url),
+        'status': response.status_code,
+        'headers': headers,
+        'fresh_until': freshness_deadline(response.headers, now),
+        'etag': response.headers.get('etag'),
+        'last_modified': response.headers.get('last-modified'),
+    }
+    # Nothing to gain from storing a response that is already stale and cannot be revalidated
+    if meta['fresh_until'] <= now and not (meta['etag'] or meta['last_modified']):
+        return
+    _get_cache().set(key, body, meta)
+
+def lookup(url, headers=None):
+    """(cache key, (body, meta) or None) for a GET of url; requests carrying credentials get (None, None)."""
+    headers = {k.lower(): v for k, v in (headers or {}).items()}
+    if 'authorization' in headers:
+        return None, None
+    key = cache_key(httpx.URL(url), headers)
+    return key, _get_cache().get(key)
+
+def is_fresh(hit, now=None):
+    return bool(hit) and hit[1].get('fresh_until', 0) > (time.time() if now is None else now)
+
+def validators(hit):
+    """If-None-Match / If-Modified-Since headers that let the server answer 304 for the cached entry."""
+    headers = {}
+    if hit:
+        meta = hit[1]
+        if meta.get('etag'):
+            headers['if-none-match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['if-modified-since'] = meta['last_modified']
+    return headers
+
+def revalidated(key, hit, response, now=None):
+    """Refresh the cached entry from a 304 response; returns its (body, meta)."""
+    body, meta = hit
+    meta['headers'].update({k: v for k, v in response.headers.items() if k.lower() not in DROP_HEADERS})
+    meta['fresh_until'] = freshness_deadline(httpx.Headers(meta['headers']), time.time() if now is None else now)
+    _get_cache().set(key, body, meta)
+    logging.debug(f"[http_cache] Revalidated {meta['url']}")
+    return body, meta
+
+def cached_get(request_fn, url, params=None, headers=None, **kwargs):
+    """
+    GET through the persistent response cache. Fresh entries are served from disk; stale entries are
+    revalidated with If-None-Match / If-Modified-Since so an unchanged resource costs a 304.
+    Requests carrying credentials are never cached.
+    """
+    headers = {k.lower(): v for k, v in (headers or {}).items()}
+    full_url = httpx.URL(url, params=params) if params else httpx.URL(url)
+    key, hit = lookup(full_url, headers)
+    if key is None:
+        return request_fn('GET', url, params=params, headers=headers, **kwargs)
+    now = time.time()
+    if is_fresh(hit, now):
+        return _from_cache(*hit)
+    response = request_fn('GET', str(full_url), headers={**headers, **validators(hit)}, **kwargs)
+    if response.status_code == 304 and hit:
+        return _from_cache(*revalidated(key, hit, response, now))
+    store(key, response, now=now)
+    return response
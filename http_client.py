@@ -0,0 +1,137 @@
+import os
+import socket
+import threading
+import time
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+import httpx
+import politeness
+
+# --- CONFIG ---
+HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', 15))
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 5))
+HTTP_MAX_CONNECTIONS = int(os.getenv('HTTP_MAX_CONNECTIONS', 100))
+HTTP_MAX_KEEPALIVE = int(os.getenv('HTTP_MAX_KEEPALIVE', 40))
+HTTP_KEEPALIVE_EXPIRY = 30
+HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', 2))
+HTTP2_ENABLED = os.getenv('HTTP2_ENABLED', '1') == '1'
+# Opt-in DNS cache: seconds to reuse a getaddrinfo answer (0, the default, leaves resolution to the system).
+# getaddrinfo does not expose record TTLs, so keep this short; it patches socket.getaddrinfo process-wide.
+DNS_CACHE_TTL = float(os.getenv('DNS_CACHE_TTL', 0))
+DNS_CACHE_MAX_ENTRIES = int(os.getenv('DNS_CACHE_MAX_ENTRIES', 1024))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+DEFAULT_HEADERS = {'User-Agent': 'Mozilla/5.0 (compatible; ClientPrepAgent/1.0)'}
+
+_client = None
+_client_lock = threading.Lock()
+
+# --- DNS cache ---
+# httpx resolves through socket.getaddrinfo on every new connection; when enabled, answers are reused for
+# DNS_CACHE_TTL seconds in an LRU of DNS_CACHE_MAX_ENTRIES. Lookups that fail raise and are never cached.
+_dns_cache = OrderedDict()
+_dns_lock = threading.Lock()
+_original_getaddrinfo = socket.getaddrinfo
+
+def _cached_getaddrinfo(host, port, *args, **kwargs):
+    key = (host, port, args, tuple(sorted(kwargs.items())))
+    now = time.monotonic()
+    with _dns_lock:
+        hit = _dns_cache.get(key)
+        if hit and hit[0] > now:
+            _dns_cache.move_to_end(key)
+            return hit[1]
+        _dns_cache.pop(key, None)
+    result = _original_getaddrinfo(host, port, *args, **kwargs)
+    with _dns_lock:
+        _dns_cache[key] = (now + DNS_CACHE_TTL, result)
+        while len(_dns_cache) > DNS_CACHE_MAX_ENTRIES:
+            _dns_cache.popitem(last=False)
+    return result
+
+if DNS_CACHE_TTL > 0 and socket.getaddrinfo is _original_getaddrinfo:
+    socket.getaddrinfo = _cached_getaddrinfo
+
+def _http2_available():
+    if not HTTP2_ENABLED:
+        return False
+    try:
+        import h2  # noqa: F401  (pinned in requirements.txt; missing only in a partial install)
+        return True
+    except ImportError:
+        return False
+
+def get_client():
+    """Process-wide pooled httpx client (keep-alive, optional HTTP/2, default timeouts, follows redirects)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(
+                    http2=_http2_available(),
+                    limits=httpx.Limits(
+                        max_connections=HTTP_MAX_CONNECTIONS,
+                        max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+                    ),
+                    timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+                    headers=DEFAULT_HEADERS,
+                    follow_redirects=True,
+                )
+    return _client
+
+def _should_retry(method, attempt, retries, response=None, error=None):
+    if attempt >= retries or method.upper() not in IDEMPOTENT_METHODS:
+        return False
+    if error is not None:
+        return isinstance(error, httpx.TransportError)
+    return response.status_code in RETRY_STATUSES
+
+def request(method, url, retries=None, **kwargs):
+    """
+    Send a request through the shared client. Accepts the requests-style keyword arguments used in this
+    codebase (params, headers, data, json, files, timeout) and returns an httpx.Response.
+    Idempotent requests are retried on connection errors and RETRY_STATUSES with jittered exponential backoff.
+    Every attempt goes through the per-domain politeness scheduler (rate limit, in-flight cap, Retry-After);
+    a domain that stays busy delays the request by at most POLITENESS_MAX_WAIT, it never fails it.
+    """
+    retries = HTTP_RETRIES if retries is None else retries
+    client = get_client()
+    attempt = 0
+    while True:
+        with politeness.slot(url, strict=False):
+            try:
+                response = client.request(method, url, **kwargs)
+            except Exception as e:
+                if not _should_retry(method, attempt, retries, error=e):
+                    raise
+                logging.info(f"[http_client] {method} {url} failed ({e}); retrying")
+                response = None
+        if response is not None:
+            politeness.record_response(url, response.status_code, response.headers)
+            if not _should_retry(method, attempt, retries, response=response):
+                return response
+        time.sleep(politeness.backoff_delay(attempt))
+        attempt += 1
+
+def get(url, cache=False, **kwargs):
+    """GET through the shared client; cache=True serves and revalidates through the persistent response cache."""
+    if cache:
+        from http_cache import cached_get
+        return cached_get(request, url, **kwargs)
+    return request('GET', url, **kwargs)
+
+def post(url, **kwargs):
+    return request('POST', url, **kwargs)
+
+def head(url, **kwargs):
+    return request('HEAD', url, **kwargs)
+
+@contextmanager
+def stream(method, url, **kwargs):
+    """Streamed request through the shared client; the domain's politeness slot is held until the body is consumed."""
+    with politeness.slot(url, strict=False):
+        with get_client().stream(method, url, **kwargs) as response:
+            politeness.record_response(url, response.status_code, response.headers)
+            yield response
@@ -0,0 +1,154 @@
+import os
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+import http_client
+import http_cache
+
+# --- CONFIG ---
+IR_DOWNLOAD_CONCURRENCY = int(os.getenv('IR_DOWNLOAD_CONCURRENCY', 4))
+IR_MAX_FILE_BYTES = int(os.getenv('IR_MAX_FILE_BYTES', 50 * 1024 * 1024))  # per document
+IR_MAX_JOB_BYTES = int(os.getenv('IR_MAX_JOB_BYTES', 200 * 1024 * 1024))  # across one download job
+IR_CHUNK_SIZE = 64 * 1024
+IR_DOWNLOAD_TIMEOUT = 30
+
+# Leading bytes of each document type we parse; anything else (HTML error pages, login walls) is discarded
+MAGIC_BYTES = {
+    'pdf': (b'%PDF-',),
+    'xls': (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1',),  # OLE2 compound file
+    'xlsx': (b'PK\x03\x04',),  # zip container
+}
+HTML_MARKERS = (b'<!doctype html', b'<html', b'<?xml', b'<head', b'<body')
+
+class DownloadLimitExceeded(Exception):
+    pass
+
+def sniff_kind(head, content_type='', url=''):
+    """'pdf' / 'xls' / 'xlsx' from the first bytes of a body, using Content-Type and the URL only as tie-breakers."""
+    for kind, signatures in MAGIC_BYTES.items():
+        if head.startswith(signatures):
+            if kind == 'xlsx' and not (url.lower().split('?')[0].endswith('.xlsx') or 'spreadsheet' in content_type):
+                return None  # some other zip archive
+            return kind
+    stripped = head.lstrip().lower()
+    if stripped.startswith(HTML_MARKERS) or 'text/html' in content_type:
+        return None
+    # Some servers prepend junk before %PDF-; readers accept it within the first KB
+    if b'%PDF-' in head[:1024]:
+        return 'pdf'
+    return None
+
+class _JobBudget:
+    def __init__(self, limit):
+        self.limit = limit
+        self.used = 0
+        self.cancelled = False
+        self.lock = threading.Lock()
+
+    def take(self, n):
+        with self.lock:
+            if self.cancelled:
+                raise DownloadLimitExceeded("download job closed")
+            if self.used + n > self.limit:
+                raise DownloadLimitExceeded(f"job byte cap of {self.limit} reached")
+            self.used += n
+
+def _save_cached(url, path, name, body, content_type, budget, max_file_bytes, kinds):
+    """Write a body served by the response cache to path, with the same checks as a streamed one."""
+    kind = sniff_kind(body[:IR_CHUNK_SIZE], content_type, url)
+    if kind not in kinds or len(body) > max_file_bytes:
+        logging.info(f"[ir_downloader] {url}: cached body is not an accepted document")
+        return None
+    budget.take(len(body))
+    with open(path, 'wb') as f:
+        f.write(body)
+    return {'url': url, 'path': path, 'filename': name, 'kind': kind, 'size': len(body)}
+
+def _download(url, dest_dir, budget, max_file_bytes, kinds):
+    """
+    Stream one document to dest_dir; returns a file dict or None when it is not an accepted document.
+    Bodies go through the HTTP response cache: a fresh entry is reused without a request, a stale one is
+    revalidated with its ETag / Last-Modified so an unchanged document costs a 304.
+    """
+    name = os.path.basename(urlparse(url).path) or 'document'
+    path = os.path.join(dest_dir, f"{hashlib.sha1(url.encode('utf-8')).hexdigest()[:12]}_{name}")
+    now = time.time()
+    key, hit = http_cache.lookup(url)
+    if http_cache.is_fresh(hit, now):
+        body, meta = hit
+        return _save_cached(url, path, name, body, meta['headers'].get('content-type', '').lower(), budget, max_file_bytes, kinds)
+    with http_client.stream('GET', url, headers=http_cache.validators(hit), timeout=IR_DOWNLOAD_TIMEOUT) as resp:
+        if resp.status_code == 304 and hit:
+            body, meta = http_cache.revalidated(key, hit, resp, now)
+            logging.info(f"[ir_downloader] {url}: not modified, using cached copy")
+            return _save_cached(url, path, name, body, meta['headers'].get('content-type', '').lower(), budget, max_file_bytes, kinds)
+        if resp.status_code != 200:
+            logging.info(f"[ir_downloader] {url}: HTTP {resp.status_code}")
+            return None
+        declared = int(resp.headers.get('content-length') or 0)
+        if declared > max_file_bytes:
+            logging.info(f"[ir_downloader] {url}: {declared} bytes exceeds the per-file cap")
+            return None
+        content_type = resp.headers.get('content-type', '').lower()
+        kind = None
+        size = 0
+        try:
+            with open(path, 'wb') as f:
+                for chunk in resp.iter_bytes(IR_CHUNK_SIZE):
+                    if kind is None:
+                        kind = sniff_kind(chunk, content_type, url)
+                        if kind not in kinds:
+                            logging.info(f"[ir_downloader] {url}: not a {'/'.join(kinds)} document ({content_type or 'unknown type'})")
+                            kind = None
+                            break
+                    size += len(chunk)
+                    if size > max_file_bytes:
+                        raise DownloadLimitExceeded(f"{url} exceeds the per-file cap of {max_file_bytes} bytes")
+                    budget.take(len(chunk))
+                    f.write(chunk)
+        except Exception:
+            os.remove(path)
+            raise
+        if kind is None:
+            os.remove(path)
+            return None
+    if key and size <= http_cache.HTTP_CACHE_MAX_ENTRY_BYTES:
+        with open(path, 'rb') as f:
+            http_cache.store(key, resp, body=f.read(), now=now)
+    return {'url': url, 'path': path, 'filename': name, 'kind': kind, 'size': size}
+
+def iter_downloads(links, kinds=('pdf',), concurrency=IR_DOWNLOAD_CONCURRENCY,
+                   max_file_bytes=IR_MAX_FILE_BYTES, max_job_bytes=IR_MAX_JOB_BYTES):
+    """
+    Download IR documents concurrently, streaming each to a temporary directory in chunks, and yield
+    {'url', 'path', 'filename', 'kind', 'size'} for every accepted document as soon as it completes, so
+    parsing overlaps the remaining downloads. Bodies are sniffed by magic bytes (HTML responses are
+    dropped), and per-file / per-job byte caps abort oversized transfers. The temporary files are
+    removed when the generator finishes, so consume each file inside the loop.
+    """
+    links = list(dict.fromkeys(links))
+    if not links:
+        return
+    dest_dir = tempfile.mkdtemp(prefix='ir-docs-')
+    budget = _JobBudget(max_job_bytes)
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='ir-download')
+    try:
+        futures = {pool.submit(_download, url, dest_dir, budget, max_file_bytes, kinds): url for url in links}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                logging.error(f"[ir_downloader] Error downloading {futures[future]}: {e}")
+                continue
+            if result:
+                yield result
+    finally:
+        # Consumer stopped early or everything is done: abort transfers still running, then clean up
+        budget.cancelled = True
+        pool.shutdown(wait=True, cancel_futures=True)
+        shutil.rmtree(dest_dir, ignore_errors=True)
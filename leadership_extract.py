@@ -0,0 +1,113 @@
+import os
+import re
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+import tldextract
+import http_client
+import html_extract
+from disk_cache import DiskCache
+
+# --- CONFIG ---
+# Off by default: leaders regex-scraped from company websites feed the crawler report and Slack key-executive answers only when on
+LEADERSHIP_FROM_WEBSITE = os.getenv('LEADERSHIP_FROM_WEBSITE', '0') == '1'
+LEADERSHIP_TTL = int(os.getenv('LEADERSHIP_TTL', 7 * 86400))
+LEADERSHIP_NEGATIVE_TTL = int(os.getenv('LEADERSHIP_NEGATIVE_TTL', 86400))  # sites where nothing was found
+LEADERSHIP_MAX_PAGES = 3  # candidate pages fetched per site
+FETCH_TIMEOUT = 10
+# Link hints in priority order: a /leadership page is tried before a generic /about page
+LINK_HINTS = ["leadership", "management", "executive", "board", "team", "about", "investor", "ir"]
+# "Jane Doe, Chief Executive Officer" and "Chairman: John Smith"
+NAME_ROLE = re.compile(r"([A-Z][a-zA-Z .'-]+)[,\-–]+\s*([A-Z][a-zA-Z &]+)")
+ROLE_NAME = re.compile(r"([A-Z][a-zA-Z &]+)[:\-]+\s*([A-Z][a-zA-Z .'-]+)")
+
+_cache = None
+_inflight = {}
+_lock = threading.Lock()
+
+def _get_cache():
+    global _cache
+    if _cache is None:
+        _cache = DiskCache('leadership')
+    return _cache
+
+def site_key(website_url):
+    """Registered domain of a website ('https://www.tcs.com/about' -> 'tcs.com'); the memoization key."""
+    ext = tldextract.extract(website_url)
+    return ext.registered_domain or ext.domain or website_url
+
+def candidate_links(html, base_url):
+    """Likely leadership pages linked from html, best hint first, at most LEADERSHIP_MAX_PAGES."""
+    ranked = {}
+    for href, _ in html_extract.links(html, base_url):
+        lowered = href.lower()
+        rank = next((i for i, hint in enumerate(LINK_HINTS) if hint in lowered), None)
+        if rank is not None and href.startswith('http') and rank < ranked.get(href, len(LINK_HINTS)):
+            ranked[href] = rank
+    return sorted(ranked, key=ranked.get)[:LEADERSHIP_MAX_PAGES]
+
+def leaders_in(html):
+    """Name/role pairs found in the page's text blocks, each block read once."""
+    leaders = []
+    for text in html_extract.text_blocks(html):
+        m = NAME_ROLE.match(text)
+        if m:
+            name, role = m.group(1).strip(), m.group(2).strip()
+            if len(name.split()) >= 2 and len(role) > 2:
+                leaders.append({"name": name, "role": role})
+        m = ROLE_NAME.match(text)
+        if m:
+            role, name = m.group(1).strip(), m.group(2).strip()
+            if len(name.split()) >= 2 and len(role) > 2:
+                leaders.append({"name": name, "role": role})
+    return leaders
+
+def _fetch_leaders(url):
+    try:
+        return leaders_in(http_client.get(url, timeout=FETCH_TIMEOUT, cache=True).text)
+    except Exception as e:
+        logging.info(f"[leadership_extract] {url} failed: {e}")
+        return []
+
+def _extract(website_url):
+    resp = http_client.get(website_url, timeout=FETCH_TIMEOUT, cache=True)
+    links = candidate_links(resp.text, str(resp.url))
+    with ThreadPoolExecutor(max_workers=max(len(links), 1)) as pool:
+        pages = list(pool.map(_fetch_leaders, links))
+    seen = set()
+    leadership = []
+    for leader in (l for page in pages for l in page):
+        key = (leader['name'].lower(), leader['role'].lower())
+        if key not in seen:
+            seen.add(key)
+            leadership.append(leader)
+    return leadership
+
+def extract(website_url):
+    """
+    Leadership [{'name', 'role'}] from a company website's About/Leadership/Management/IR pages, memoized per
+    registered domain in the 'leadership' DiskCache; concurrent calls for the same site share one extraction.
+    Raises if the home page cannot be fetched (nothing is cached then).
+    """
+    key = site_key(website_url)
+    hit = _get_cache().get_json(key)
+    if hit is not None:
+        return hit
+    with _lock:
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = _inflight[key] = Future()
+    if not owner:
+        return future.result()
+    try:
+        leadership = _extract(website_url)
+        _get_cache().set_json(key, leadership, ttl=LEADERSHIP_TTL if leadership else LEADERSHIP_NEGATIVE_TTL)
+        future.set_result(leadership)
+        return leadership
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _lock:
+            _inflight.pop(key, None)
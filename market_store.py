@@ -0,0 +1,256 @@
+import os
+import re
+import json
+import time
+import logging
+import threading
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import politeness
+from disk_cache import CACHE_DIR
+
+# --- CONFIG ---
+MARKET_DIR = os.path.join(CACHE_DIR, 'market')
+FUNDAMENTALS_TTL = int(os.getenv('MARKET_FUNDAMENTALS_TTL', 86400))  # info and financials
+PRICES_TTL = int(os.getenv('MARKET_PRICES_TTL', 15 * 60))  # daily bars; today's bar moves intraday
+HISTORY_YEARS = 5  # kept per ticker; charts read the last 3
+YAHOO_API = 'https://query2.finance.yahoo.com'  # politeness slot for yfinance calls
+BULK_FUNDAMENTALS_WORKERS = 4  # yfinance has no multi-ticker info/financials call
+
+_locks = {}
+_locks_lock = threading.Lock()
+
+def _ticker_lock(ticker):
+    with _locks_lock:
+        return _locks.setdefault(ticker, threading.Lock())
+
+def _path(ticker, dataset, ext='parquet'):
+    safe = re.sub(r'[^A-Za-z0-9._^=-]', '_', ticker.upper())
+    return os.path.join(MARKET_DIR, safe, f"{dataset}.{ext}")
+
+def _fresh(path, ttl):
+    # A dataset's fetch time is its file's mtime; a refresh that found nothing new just touches the file
+    return os.path.exists(path) and time.time() - os.path.getmtime(path) < ttl
+
+def _write_atomic(path, write):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+def _read_table(path):
+    # Memory-mapped read: column buffers are paged in from the file instead of copied through Python
+    return pq.read_table(path, memory_map=True)
+
+def _yf_ticker(ticker):
+    import yfinance as yf
+    return yf.Ticker(ticker)
+
+def _load(ticker, dataset, ttl, fetch, read, write, ext='parquet'):
+    """Serve dataset from disk while fresh; otherwise fetch and store it. Stale data is served if the fetch fails."""
+    path = _path(ticker, dataset, ext)
+    if _fresh(path, ttl):
+        return read(path)
+    with _ticker_lock(ticker):
+        if _fresh(path, ttl):  # another thread refreshed it while we waited
+            return read(path)
+        try:
+            with politeness.slot(YAHOO_API):
+                data = fetch()
+        except Exception as e:
+            if os.path.exists(path):
+                logging.warning(f"[market_store] {dataset} refresh failed for {ticker}, serving stored copy: {e}")
+                return read(path)
+            raise
+        _write_atomic(path, lambda tmp: write(data, tmp))
+        return read(path)
+
+def get_info(ticker):
+    """yfinance Ticker.info for ticker, refreshed at most every FUNDAMENTALS_TTL seconds."""
+    def read(path):
+        with open(path) as f:
+            return json.load(f)
+
+    def write(info, path):
+        with open(path, 'w') as f:
+            json.dump(info, f, default=str)
+
+    return _load(ticker, 'info', FUNDAMENTALS_TTL, lambda: dict(_yf_ticker(ticker).info or {}), read, write, ext='json')
+
+def get_financials(ticker):
+    """yfinance Ticker.financials (metrics x period columns, latest first), refreshed at most every FUNDAMENTALS_TTL seconds."""
+    def read(path):
+        # Stored transposed: one row per period, one column per metric (Parquet needs string column names)
+        return _read_table(path).to_pandas().T
+
+    def write(fin, path):
+        fin = fin.T
+        fin.columns = [str(c) for c in fin.columns]
+        pq.write_table(pa.Table.from_pandas(fin), path)
+
+    return _load(ticker, 'financials', FUNDAMENTALS_TTL, lambda: _yf_ticker(ticker).financials, read, write)
+
+def _merge_history(stored, fresh):
+    """stored bars plus fresh ones (fresh wins on the same day), trimmed to HISTORY_YEARS."""
+    if stored is None or stored.empty:
+        combined = fresh
+    elif fresh.empty:
+        return stored
+    else:
+        if fresh.index.tz is None and stored.index.tz is not None:
+            fresh = fresh.tz_localize(stored.index.tz)
+        combined = pd.concat([stored, fresh])
+        combined = combined[~combined.index.duplicated(keep='last')].sort_index()
+    if combined.empty:
+        return combined
+    return combined[combined.index >= combined.index[-1] - pd.DateOffset(years=HISTORY_YEARS)]
+
+def _new_actions(stored, fresh):
+    """
+    True if fresh bars carry a split or dividend the stored bars do not. Bars are adjusted (auto_adjust),
+    so such an action rescales every earlier close and the stored history can no longer just be extended.
+    """
+    columns = [c for c in ('Dividends', 'Stock Splits') if c in fresh.columns]
+    if not columns or fresh.empty:
+        return False
+    if fresh.index.tz is None and stored.index.tz is not None:
+        fresh = fresh.tz_localize(stored.index.tz)
+    known = stored.reindex(columns=columns).reindex(fresh.index).fillna(0)
+    return bool((fresh[columns].fillna(0) != known).any().any())
+
+def _stored_history(path):
+    return _read_table(path).to_pandas() if os.path.exists(path) else None
+
+def _update_history(ticker, path):
+    """
+    Stored daily bars plus only the missing days; the last stored day is refetched since it may have been partial.
+    The whole period is refetched instead when the new days bring a split or dividend.
+    """
+    stored = _stored_history(path)
+    yf_ticker = _yf_ticker(ticker)
+    if stored is None or stored.empty:
+        return yf_ticker.history(period=f"{HISTORY_YEARS}y")
+    fresh = yf_ticker.history(start=stored.index[-1].strftime('%Y-%m-%d'))
+    if _new_actions(stored, fresh):
+        logging.info(f"[market_store] Split or dividend for {ticker}, refetching {HISTORY_YEARS}y of adjusted bars")
+        return yf_ticker.history(period=f"{HISTORY_YEARS}y")
+    return _merge_history(stored, fresh)
+
+def get_history(ticker, years=3):
+    """Daily OHLCV bars (yfinance Ticker.history columns) for the last `years` years, refreshed at most every PRICES_TTL seconds."""
+    path = _path(ticker, 'history')
+
+    def read(path):
+        hist = _read_table(path).to_pandas()
+        if hist.empty:
+            return hist
+        return hist[hist.index >= hist.index[-1] - pd.DateOffset(years=years)]
+
+    def write(hist, path):
+        pq.write_table(pa.Table.from_pandas(hist), path)
+
+    return _load(ticker, 'history', PRICES_TTL, lambda: _update_history(ticker, path), read, write)
+
+def exchange_group(ticker):
+    """'INFY.NS' -> 'NS', 'RELIANCE.BO' -> 'BO', 'AAPL' -> 'US': tickers of one group share a trading calendar and time zone."""
+    return ticker.rsplit('.', 1)[1].upper() if '.' in ticker else 'US'
+
+def _download(tickers, **kwargs):
+    """One yf.download call for tickers -> {ticker: bars}; columns match Ticker.history."""
+    import yfinance as yf
+    with politeness.slot(YAHOO_API):
+        data = yf.download(tickers, group_by='ticker', actions=True, auto_adjust=True, ignore_tz=False,
+                           progress=False, threads=True, **kwargs)
+    bars = {}
+    for ticker in tickers:
+        try:
+            frame = data[ticker] if isinstance(data.columns, pd.MultiIndex) else data
+        except KeyError:
+            continue
+        frame = frame.dropna(how='all')
+        frame.columns.name = None
+        bars[ticker] = frame
+    return bars
+
+def _refresh_prices(tickers):
+    """
+    Batched price refresh for stale tickers of one exchange group: one call for new tickers, one for the rest,
+    and one more for those whose new bars bring a split or dividend.
+    Every ticker's lock is held from reading its stored bars to writing the merged ones, as in _load.
+    """
+    with ExitStack() as held:
+        for ticker in sorted(tickers):  # one global order, so two overlapping refreshes cannot deadlock
+            held.enter_context(_ticker_lock(ticker))
+        tickers = [t for t in tickers if not _fresh(_path(t, 'history'), PRICES_TTL)]  # refreshed while we waited
+        stored = {t: _stored_history(_path(t, 'history')) for t in tickers}
+        new = [t for t in tickers if stored[t] is None or stored[t].empty]
+        known = [t for t in tickers if t not in new]
+        fetched = {}
+        if new:
+            fetched.update(_download(new, period=f"{HISTORY_YEARS}y"))
+        if known:
+            # From the oldest last-stored day in the group, so every ticker's gap (and its partial last day) is covered
+            start = min(stored[t].index[-1] for t in known).strftime('%Y-%m-%d')
+            fetched.update(_download(known, start=start))
+            # Adjusted bars: a split or dividend in the new days invalidates the stored ones, so those start over
+            adjusted = [t for t in known if t in fetched and _new_actions(stored[t], fetched[t])]
+            if adjusted:
+                logging.info(f"[market_store] Split or dividend for {adjusted}, refetching {HISTORY_YEARS}y of adjusted bars")
+                fetched.update(_download(adjusted, period=f"{HISTORY_YEARS}y"))
+                for ticker in adjusted:
+                    stored[ticker] = None
+        for ticker in tickers:
+            fresh = fetched.get(ticker)
+            if fresh is None:
+                logging.info(f"[market_store] No bars returned for {ticker}")
+                continue
+            merged = _merge_history(stored[ticker], fresh)
+            _write_atomic(_path(ticker, 'history'), lambda tmp: pq.write_table(pa.Table.from_pandas(merged), tmp))
+
+def refresh_many(tickers):
+    """
+    Bring many tickers' stored data up to date. Price history for stale tickers is fetched with one or two
+    yf.download calls per exchange group; stale info/financials (no batch endpoint) use a small thread pool.
+    Returns {'prices': n tickers refreshed, 'fundamentals': n refreshed, 'failed': [tickers]}.
+    """
+    tickers = list(dict.fromkeys(t for t in tickers if t))
+    groups = {}
+    for ticker in tickers:
+        if not _fresh(_path(ticker, 'history'), PRICES_TTL):
+            groups.setdefault(exchange_group(ticker), []).append(ticker)
+    failed = []
+    refreshed_prices = 0
+    for group, members in groups.items():
+        try:
+            _refresh_prices(members)
+            refreshed_prices += len(members)
+        except Exception as e:
+            logging.warning(f"[market_store] Bulk price refresh failed for {group} {members}: {e}")
+            failed.extend(members)
+    stale = [t for t in tickers if not _fresh(_path(t, 'info', 'json'), FUNDAMENTALS_TTL) or not _fresh(_path(t, 'financials'), FUNDAMENTALS_TTL)]
+
+    def fundamentals(ticker):
+        try:
+            get_info(ticker)
+            get_financials(ticker)
+            return True
+        except Exception as e:
+            logging.warning(f"[market_store] Fundamentals refresh failed for {ticker}: {e}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=BULK_FUNDAMENTALS_WORKERS) as pool:
+        ok = list(pool.map(fundamentals, stale))
+    failed.extend(t for t, good in zip(stale, ok) if not good and t not in failed)
+    logging.info(f"[market_store] Refreshed prices for {refreshed_prices} and fundamentals for {sum(ok)} of {len(tickers)} tickers")
+    return {'prices': refreshed_prices, 'fundamentals': sum(ok), 'failed': failed}
+
+def refresh_watchlist(company_names):
+    """Resolve company names to tickers and bulk-refresh them; returns {company name: ticker} for those that resolved."""
+    import ticker_resolver
+    resolved = {name: ticker_resolver.resolve(name) for name in company_names}
+    resolved = {name: ticker for name, ticker in resolved.items() if ticker}
+    refresh_many(list(resolved.values()))
+    return resolved
@@ -1,31 +1,41 @@
-import requests
-from bs4 import BeautifulSoup
 import re
+import http_client
+import url_discovery
+import html_extract
+from urllib.parse import urlparse
 
 def fetch_text_from_url(url):
     if not url.startswith(('http://', 'https://')):
         url = 'https://' + url
-    response = requests.get(url, timeout=10, headers={'User-Agent': 'Mozilla/5.0'})
-    soup = BeautifulSoup(response.text, 'html.parser')
+    response = http_client.get(url, timeout=10, headers={'User-Agent': 'Mozilla/5.0'}, cache=True)
+    # Text of paragraphs, list items and headings, with script/style/nav/header/footer/aside removed
+    return html_extract.paragraph_text(response.text)
 
-    # Remove unwanted tags
-    for tag in soup(["script", "style", "nav", "header", "footer", "aside"]):
-        tag.decompose()
+IR_LINK_HINTS = ['pdf', 'xls', 'xlsx', 'investor', 'ir', 'presentation', 'results', 'earnings']
+# Sitemaps list every page of a site, so their URLs must match more strictly than homepage links:
+# a document extension, or a hint as a whole word of a path segment (/ir/ but not /directors/)
+IR_DOCUMENT_EXTENSIONS = ('.pdf', '.xls', '.xlsx')
+IR_PATH_WORDS = {'investor', 'investors', 'ir', 'presentation', 'presentations', 'results', 'earnings'}
+IR_SITEMAP_MAX_LINKS = 25
 
-    text = ' '.join(p.get_text().strip() for p in soup.find_all(['p', 'li', 'h1', 'h2', 'h3']))
-    return re.sub(r'\s+', ' ', text)
+def _is_ir_sitemap_url(url):
+    path = urlparse(url).path.lower()
+    if path.endswith(IR_DOCUMENT_EXTENSIONS):
+        return True
+    return any(word in IR_PATH_WORDS for word in re.split(r'[/_.-]+', path))
 
 def extract_ir_links(base_url):
-    """Extract PDF, Excel, and investor relations links from the given website."""
+    """Extract PDF, Excel, and investor relations links from the given website and its sitemaps."""
     try:
-        response = requests.get(base_url, timeout=10)
-        soup = BeautifulSoup(response.text, 'html.parser')
+        response = http_client.get(base_url, timeout=10, cache=True)
         links = []
-        for a in soup.find_all('a', href=True):
-            href = a['href']
-            if any(ext in href.lower() for ext in ['pdf', 'xls', 'xlsx', 'investor', 'ir', 'presentation', 'results', 'earnings']):
+        for href, _ in html_extract.links(response.text):
+            if any(ext in href.lower() for ext in IR_LINK_HINTS):
                 full_url = href if href.startswith('http') else base_url.rstrip('/') + '/' + href.lstrip('/')
                 links.append(full_url)
+        # Documents that are only linked from deeper pages are usually listed in the sitemap
+        sitemap_links = [u for u in url_discovery.discover_urls(base_url) if _is_ir_sitemap_url(u)]
+        links.extend(sitemap_links[:IR_SITEMAP_MAX_LINKS])
         return list(set(links))
     except Exception as e:
         print(f"Failed to extract links: {e}")
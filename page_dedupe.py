@@ -0,0 +1,80 @@
+import os
+import re
+import hashlib
+import numpy as np
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+
+# --- CONFIG ---
+# Pages whose estimated Jaccard similarity (over word 3-shingles) is at or above this are near-duplicates
+DEDUPE_SIMILARITY = float(os.getenv('DEDUPE_SIMILARITY', 0.8))
+SHINGLE_SIZE = 3
+NUM_PERMUTATIONS = 64
+MERSENNE_PRIME = (1 << 31) - 1  # with 32-bit shingle hashes, a * h + b stays inside uint64
+# Fixed seed so signatures are comparable across runs
+_rng = np.random.default_rng(20240501)
+PERM_A = _rng.integers(1, MERSENNE_PRIME, size=(NUM_PERMUTATIONS, 1), dtype=np.uint64)
+PERM_B = _rng.integers(0, MERSENNE_PRIME, size=(NUM_PERMUTATIONS, 1), dtype=np.uint64)
+
+# Leading path segments treated as locales: a known language code, optionally with a region (/en, /en-gb, /de_DE).
+# An explicit list, since two-letter sections such as /ir or /us are real pages on company sites.
+LOCALE_LANGUAGES = ['en', 'de', 'fr', 'es', 'it', 'nl', 'pt', 'ja', 'zh', 'ko', 'ru', 'sv', 'da', 'fi', 'nb', 'pl', 'tr', 'ar', 'hi']
+LOCALE_SEGMENT = re.compile(rf"^/(?:{'|'.join(LOCALE_LANGUAGES)})(?:[-_][a-z]{{2}})?(?=/|$)", re.IGNORECASE)
+PAGINATION_SEGMENT = re.compile(r"/page/\d+/?$", re.IGNORECASE)
+IGNORED_PARAMS = re.compile(r"^(?:utm_\w+|page|pg|start|offset|sort|ref|fbclid|gclid|lang|locale)$", re.IGNORECASE)
+WORD = re.compile(r"\w+")
+
+def canonical_url(url, keep_host=False):
+    """
+    URL key under which locale variants, paginated listings and tracking-parameter variants collapse:
+    https://x.com/en-gb/news/page/3?utm_source=y -> https://x.com/news
+    keep_host=True leaves the host as written (www. included), giving a URL that can be fetched.
+    """
+    parsed = urlparse(url)
+    path = LOCALE_SEGMENT.sub('', parsed.path) or '/'
+    path = PAGINATION_SEGMENT.sub('', path).rstrip('/') or '/'
+    query = urlencode([(k, v) for k, v in parse_qsl(parsed.query) if not IGNORED_PARAMS.match(k)])
+    netloc = parsed.netloc if keep_host else parsed.netloc.lower().removeprefix('www.')
+    return urlunparse((parsed.scheme, netloc, path, '', query, ''))
+
+def _shingles(text):
+    words = WORD.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+def minhash(text):
+    """MinHash signature over word shingles; the share of equal slots estimates Jaccard similarity."""
+    shingles = _shingles(text)
+    if not shingles:
+        return np.full(NUM_PERMUTATIONS, MERSENNE_PRIME, dtype=np.uint64)
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=4).digest(), 'big') for s in shingles),
+        dtype=np.uint64, count=len(shingles),
+    )
+    return ((PERM_A * hashes + PERM_B) % MERSENNE_PRIME).min(axis=1)
+
+def similarity(a, b):
+    return float(np.count_nonzero(a == b)) / NUM_PERMUTATIONS
+
+class NearDuplicateFilter:
+    """Remembers MinHash signatures of accepted texts and rejects texts too similar to one already seen."""
+
+    def __init__(self, threshold=DEDUPE_SIMILARITY):
+        self.threshold = threshold
+        self.fingerprints = []
+        self.dropped = 0
+
+    def is_duplicate(self, text):
+        """True if text is a near-duplicate of an earlier accepted text; otherwise accepts and remembers it."""
+        fingerprint = minhash(text)
+        if any(similarity(fingerprint, seen) >= self.threshold for seen in self.fingerprints):
+            self.dropped += 1
+            return True
+        self.fingerprints.append(fingerprint)
+        return False
+
+def dedupe_texts(texts, threshold=DEDUPE_SIMILARITY, key=lambda t: t):
+    """Drop near-duplicates from a list, keeping first occurrences. Returns (kept, number_dropped)."""
+    seen = NearDuplicateFilter(threshold)
+    kept = [t for t in texts if not seen.is_duplicate(key(t))]
+    return kept, seen.dropped
@@ -1,8 +1,182 @@
+import os
+import re
+import hashlib
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import fitz  # PyMuPDF
+from disk_cache import DiskCache
 
-def extract_text_from_pdf(file_path):
-    text = ""
-    with fitz.open(file_path) as doc:
-        for page in doc:
-            text += page.get_text()
-    return text
\ No newline at end of file
+# --- CONFIG ---
+PDF_MAX_PAGES = int(os.getenv('PDF_MAX_PAGES', 50))  # pages read per document
+PDF_MAX_CHARS = int(os.getenv('PDF_MAX_CHARS', 100000))  # characters kept per document
+PDF_PROCESS_WORKERS = int(os.getenv('PDF_PROCESS_WORKERS', 2))  # 0 parses in the calling thread
+PDF_TEXT_CACHE_MAX_BYTES = int(os.getenv('PDF_TEXT_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+FINANCIAL_TOP_PAGES = int(os.getenv('FINANCIAL_TOP_PAGES', 8))  # pages kept by the financial pre-pass
+FINANCIAL_SCAN_MAX_PAGES = 400
+# Phrases that mark statement / highlights pages, and their weight in the page score
+FINANCIAL_KEYWORDS = {
+    'statement of profit and loss': 6, 'income statement': 6, 'balance sheet': 6, 'cash flow statement': 5,
+    'financial highlights': 6, 'key highlights': 3, 'key financial': 4, 'revenue from operations': 4,
+    'total revenue': 3, 'total income': 3, 'net profit': 3, 'profit after tax': 3, 'profit for the year': 3,
+    'net income': 3, 'ebitda': 2, 'operating margin': 2, 'earnings per share': 3, 'total assets': 3,
+    'total equity': 2, 'crore': 1, 'million': 1,
+}
+FINANCIAL_TOC_HINTS = re.compile(r'financial (statements|highlights)|profit and loss|balance sheet|income statement|key (figures|metrics)', re.IGNORECASE)
+# A page qualifies on a statement keyword hit (unit words like 'million' alone do not count) or on table
+# density: at least this many mostly-numeric blocks making up at least this share of the page's blocks
+FINANCIAL_MIN_NUMERIC_BLOCKS = 4
+FINANCIAL_MIN_NUMERIC_SHARE = 0.25
+FINANCIAL_SCORER_VERSION = 2  # bump when page scoring changes, so cached page picks are recomputed
+NUMERIC_TOKEN = re.compile(r'^\(?-?[\d,]+(?:\.\d+)?\)?%?$')
+# Bump when _extract changes output, so cached text from the old extractor is not served
+EXTRACTOR_VERSION = f"pymupdf-{fitz.VersionBind}-1"
+
+_pool = None
+_pool_lock = threading.Lock()
+_text_cache = None
+
+def _extract(source, max_pages, max_chars):
+    """Text of the first max_pages pages, stopping once max_chars are collected. source is a path or bytes."""
+    doc = _open(source)
+    parts = []
+    collected = 0
+    with doc:
+        for i in range(min(doc.page_count, max_pages)):
+            text = doc.load_page(i).get_text()
+            parts.append(text)
+            collected += len(text)
+            if collected >= max_chars:
+                break
+    return "".join(parts)[:max_chars]
+
+def _open(source):
+    return fitz.open(stream=source, filetype="pdf") if isinstance(source, (bytes, bytearray)) else fitz.open(source)
+
+def _score_blocks(blocks):
+    """
+    Keyword hits plus table density: the share of text blocks that are mostly numbers, and how many numbers.
+    0 for pages with neither a statement keyword nor enough numeric blocks (a page number alone is not a table).
+    """
+    text = " ".join(b[4] for b in blocks).lower()
+    hits = {kw: text.count(kw) for kw in FINANCIAL_KEYWORDS}
+    score = sum(FINANCIAL_KEYWORDS[kw] * n for kw, n in hits.items())
+    statement_hit = any(n and FINANCIAL_KEYWORDS[kw] >= 2 for kw, n in hits.items())
+    numeric_blocks = 0
+    numbers = 0
+    for b in blocks:
+        tokens = b[4].split()
+        if not tokens:
+            continue
+        n = sum(1 for t in tokens if NUMERIC_TOKEN.match(t))
+        numbers += n
+        if n * 2 >= len(tokens):
+            numeric_blocks += 1
+    tabular = (numeric_blocks >= FINANCIAL_MIN_NUMERIC_BLOCKS
+               and numeric_blocks >= FINANCIAL_MIN_NUMERIC_SHARE * len(blocks))
+    if not statement_hit and not tabular:
+        return 0
+    return score + 10 * numeric_blocks / len(blocks) + min(numbers, 200) / 20
+
+def _candidate_pages(doc):
+    """Pages under financial-statement entries of the outline when there is one, else every page (capped)."""
+    toc = doc.get_toc(simple=True)
+    pages = set()
+    for i, (level, title, page) in enumerate(toc):
+        if page < 1 or not FINANCIAL_TOC_HINTS.search(title):
+            continue
+        # The section runs to the next outline entry at the same or a higher level
+        end = next((p for l, _, p in toc[i + 1:] if l <= level and p > page), page + 20)
+        pages.update(range(page - 1, min(end, page + 40, doc.page_count)))
+    if pages:
+        return sorted(pages)
+    return list(range(min(doc.page_count, FINANCIAL_SCAN_MAX_PAGES)))
+
+def _extract_financial(source, top_n, max_chars):
+    """Score candidate pages from their text blocks and return the top_n pages, in page order, with their text."""
+    scored = []
+    with _open(source) as doc:
+        for i in _candidate_pages(doc):
+            blocks = doc.load_page(i).get_text("blocks", flags=fitz.TEXT_MEDIABOX_CLIP)
+            score = _score_blocks(blocks)
+            if score > 0:
+                scored.append((score, i, "\n".join(b[4].strip() for b in blocks)))
+    best = sorted(sorted(scored, reverse=True)[:top_n], key=lambda s: s[1])
+    return {'pages': [i + 1 for _, i, _ in best], 'text': "\n\n".join(t for _, _, t in best)[:max_chars]}
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # forkserver, not fork: the parent runs threads (HTTP clients, the crawler's event loop,
+                # locks held mid-request) and forking a threaded process can deadlock the child
+                _pool = ProcessPoolExecutor(max_workers=PDF_PROCESS_WORKERS, mp_context=multiprocessing.get_context('forkserver'))
+    return _pool
+
+def _get_text_cache():
+    global _text_cache
+    if _text_cache is None:
+        _text_cache = DiskCache('pdf_text', max_bytes=PDF_TEXT_CACHE_MAX_BYTES, compress=True)
+    return _text_cache
+
+def content_key(source, *budget):
+    """SHA-256 of the PDF bytes plus everything that changes the extracted text."""
+    digest = hashlib.sha256()
+    if isinstance(source, (bytes, bytearray)):
+        digest.update(source)
+    else:
+        with open(source, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+    return ":".join([digest.hexdigest(), EXTRACTOR_VERSION, *map(str, budget)])
+
+def extract_text(source, max_pages=PDF_MAX_PAGES, max_chars=PDF_MAX_CHARS):
+    """
+    Extract text from a PDF given as a file path or bytes, within page and character budgets.
+    Results are cached by content hash, so a document seen before costs one SHA-256 instead of a parse.
+    Parsing runs in a worker process, so large filings don't hold the GIL of the calling web worker.
+    """
+    key = content_key(source, max_pages, max_chars)
+    hit = _get_text_cache().get(key)
+    if hit is not None:
+        return hit[0].decode('utf-8')
+    text = run_in_pool(_extract, source, max_pages, max_chars)
+    _get_text_cache().set(key, text.encode('utf-8'))
+    return text
+
+def extract_financial_pages(source, top_n=FINANCIAL_TOP_PAGES, max_chars=PDF_MAX_CHARS):
+    """
+    Fast pre-pass for financial extraction: pages are ranked by financial keywords and table density
+    (using the outline to narrow the scan when the PDF has one) and only the top_n are returned.
+    Returns {'pages': [1-based page numbers], 'text': text of those pages in page order}; cached like extract_text.
+    """
+    key = content_key(source, 'financial', FINANCIAL_SCORER_VERSION, top_n, max_chars)
+    hit = _get_text_cache().get_json(key)
+    if hit is not None:
+        return hit
+    result = run_in_pool(_extract_financial, source, top_n, max_chars)
+    _get_text_cache().set_json(key, result)
+    return result
+
+def extract_financial_text(source, top_n=FINANCIAL_TOP_PAGES, max_chars=PDF_MAX_CHARS):
+    """Text of the financial pages picked by extract_financial_pages, or the budgeted full text if none scored."""
+    return extract_financial_pages(source, top_n, max_chars)['text'] or extract_text(source, max_chars=max_chars)
+
+def run_in_pool(fn, *args):
+    """Run fn(*args) (a picklable, module-level function) on the PDF worker processes and wait for the result."""
+    if PDF_PROCESS_WORKERS <= 0:
+        return fn(*args)
+    global _pool
+    try:
+        return _get_pool().submit(fn, *args).result()
+    except BrokenProcessPool as e:
+        # A worker died (e.g. a malformed file crashed MuPDF); start a fresh pool for the next document
+        logging.warning(f"[pdf_parser] PDF worker crashed: {e}")
+        _pool = None
+        raise RuntimeError("PDF extraction worker crashed") from e
+
+def extract_text_from_pdf(file_path, max_pages=PDF_MAX_PAGES, max_chars=PDF_MAX_CHARS):
+    return extract_text(file_path, max_pages, max_chars)
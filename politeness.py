@@ -0,0 +1,155 @@
+import os
+import time
+import random
+import logging
+import threading
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+import tldextract
+
+# --- CONFIG ---
+POLITENESS_RATE = float(os.getenv('POLITENESS_RATE', 4))  # requests per second per domain (token refill)
+POLITENESS_BURST = int(os.getenv('POLITENESS_BURST', 8))  # bucket size
+POLITENESS_MAX_IN_FLIGHT = int(os.getenv('POLITENESS_MAX_IN_FLIGHT', 6))  # concurrent requests per domain
+POLITENESS_MAX_WAIT = float(os.getenv('POLITENESS_MAX_WAIT', 60))  # longest a caller queues for a domain
+BACKOFF_BASE = 0.5  # seconds, doubled per consecutive throttle response / retry
+BACKOFF_CAP = 60
+RETRY_AFTER_CAP = 120  # Retry-After values beyond this are clamped
+THROTTLE_STATUSES = {429, 503}
+# (rate, burst, max in flight) for the hosts we call most; everything else uses the defaults above
+DOMAIN_LIMITS = {
+    'yahoo.com': (2, 4, 3),
+    'wikipedia.org': (5, 10, 4),
+    'duckduckgo.com': (0.5, 1, 1),
+    'google.com': (1, 2, 2),
+    'gnews.io': (1, 2, 2),
+    'polygon.io': (1, 2, 2),
+    'alphavantage.co': (0.2, 1, 1),
+}
+
+_domains = {}
+_domains_lock = threading.Lock()
+
+class RateLimited(Exception):
+    """A domain stayed blocked or saturated for longer than the caller was willing to wait."""
+
+def domain_of(url):
+    host = urlparse(url if '://' in str(url) else f'https://{url}').hostname or ''
+    return tldextract.extract(host).registered_domain or host
+
+class _DomainState:
+    def __init__(self, domain):
+        self.domain = domain
+        rate, burst, max_in_flight = DOMAIN_LIMITS.get(domain, (POLITENESS_RATE, POLITENESS_BURST, POLITENESS_MAX_IN_FLIGHT))
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.tokens = float(burst)
+        self.refilled_at = time.monotonic()
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.strikes = 0  # consecutive throttle responses
+        self.cond = threading.Condition()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.refilled_at) * self.rate)
+        self.refilled_at = now
+
+    def acquire(self, max_wait, strict=True):
+        deadline = time.monotonic() + max_wait
+        with self.cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self.in_flight < self.max_in_flight and now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    self.in_flight += 1
+                    return
+                remaining = deadline - now
+                if remaining <= 0:
+                    if strict:
+                        raise RateLimited(f"waited {max_wait:.0f}s for a request slot")
+                    # Over budget: go ahead anyway; the token debt slows the callers behind this one
+                    logging.warning(f"[politeness] Waited {max_wait:.0f}s for {self.domain}; sending anyway")
+                    self.tokens -= 1
+                    self.in_flight += 1
+                    return
+                if self.in_flight >= self.max_in_flight:
+                    wait = remaining  # woken by release()
+                else:
+                    wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+                self.cond.wait(min(wait, remaining))
+
+    def release(self):
+        with self.cond:
+            self.in_flight -= 1
+            self.cond.notify_all()
+
+def _state(url):
+    domain = domain_of(url)
+    with _domains_lock:
+        state = _domains.get(domain)
+        if state is None:
+            state = _domains[domain] = _DomainState(domain)
+    return state
+
+@contextmanager
+def slot(url, max_wait=POLITENESS_MAX_WAIT, strict=True):
+    """
+    Hold a request slot for url's registered domain: waits for a free in-flight slot, a rate-limit token
+    and the end of any Retry-After / backoff block. Raises RateLimited after max_wait seconds, or with
+    strict=False proceeds anyway (for requests that must not fail just because the domain is busy).
+    """
+    state = _state(url)
+    state.acquire(max_wait, strict)
+    try:
+        yield
+    finally:
+        state.release()
+
+def set_crawl_delay(url, seconds):
+    """Apply a robots.txt Crawl-delay: at most one request every `seconds`, one at a time."""
+    if not seconds:
+        return
+    state = _state(url)
+    with state.cond:
+        state.rate = min(state.rate, 1.0 / seconds)
+        state.burst = 1
+        state.tokens = min(state.tokens, 1)
+        state.max_in_flight = 1
+
+def retry_after_seconds(value):
+    """Retry-After header (delta-seconds or HTTP-date) as seconds, or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt):
+    """Exponential backoff with jitter for the attempt-th retry (0-based)."""
+    return min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)) * random.uniform(0.5, 1.5)
+
+def record_response(url, status_code, headers=None):
+    """
+    Feed a response back to the scheduler. 429/503 block the whole domain for Retry-After seconds, or an
+    exponentially growing, jittered backoff when the header is absent; any other response clears the strikes.
+    Returns the block in seconds (0 when not throttled).
+    """
+    state = _state(url)
+    with state.cond:
+        if status_code not in THROTTLE_STATUSES:
+            state.strikes = 0
+            return 0.0
+        retry_after = retry_after_seconds((headers or {}).get('retry-after'))
+        delay = min(retry_after, RETRY_AFTER_CAP) if retry_after is not None else backoff_delay(state.strikes)
+        state.strikes += 1
+        state.blocked_until = max(state.blocked_until, time.monotonic() + delay)
+    logging.info(f"[politeness] {domain_of(url)} throttled ({status_code}); pausing {delay:.1f}s")
+    return delay
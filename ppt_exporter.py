@@ -9,6 +9,7 @@ import os
 import re
 import requests
 import threading
+from chart_service import time_series
 
 # --- Theme Constants ---
 HEADER_COLOR = RGBColor(0, 70, 140)
@@ -153,7 +154,8 @@ def add_content_slide(prs, title, body_text, slide_width, slide_height):
         p.font.name = FONT_NAME
 
 # --- Export summary to PPT (fixed 6 slides, robust parsing) ---
-def export_summary_to_ppt(summary_text, filename, company_name="Company", company_url=None):
+def export_summary_to_ppt(summary_text, filename, company_name="Company", company_url=None, price_history=None):
+    """price_history: optional (dates, closes) for a native price-trend chart slide after the summary sections."""
     prs = Presentation()
     slide_width = prs.slide_width
     slide_height = prs.slide_height
@@ -167,6 +169,8 @@ def export_summary_to_ppt(summary_text, filename, company_name="Company", compan
                 body = v
                 break
         add_content_slide(prs, section_title, body, slide_width, slide_height)
+    if price_history is not None:
+        add_price_trend_chart_slide(prs, *price_history, slide_width, slide_height, company_name=company_name)
     prs.save(filename)
     print(f"✅ Saved presentation: {filename}")
 
@@ -308,7 +312,7 @@ def add_financials_bar_chart_slide(prs, financials, slide_width, slide_height, c
     for v in financials.values():
         try:
             # Remove currency symbols and text, keep numbers
-            num = float(re.sub(r'[^\d.\-]', '', v.replace(',', '')))
+            num = float(re.sub(r'[^\d.\-]', '', str(v).replace(',', '')))
             values.append(num)
         except Exception:
             values.append(0)
@@ -326,6 +330,42 @@ def add_financials_bar_chart_slide(prs, financials, slide_width, slide_height, c
     chart.value_axis.tick_labels.font.name = FONT_NAME
     chart.chart_title.text_frame.text = ""
 
+def add_price_trend_chart_slide(prs, dates, closes, slide_width, slide_height, company_name="Company"):
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    add_modern_background(slide, slide_width, slide_height)
+    add_footer(slide, slide_width, slide_height)
+    # Title
+    title_box = slide.shapes.add_textbox(Inches(1), Inches(1), slide_width - Inches(2), Inches(1))
+    tf = title_box.text_frame
+    p = tf.paragraphs[0]
+    run = p.add_run()
+    run.text = f"Price Trend: {company_name}"
+    run.font.size = SECTION_FONT_SIZE
+    run.font.bold = True
+    run.font.color.rgb = HEADER_COLOR
+    run.font.name = FONT_NAME
+    p.alignment = PP_ALIGN.CENTER
+    # Same downsampled series as the rendered PNG chart; date categories give PowerPoint a real date axis
+    dates, closes = time_series(dates, closes)
+    chart_data = CategoryChartData(number_format='0.00')
+    chart_data.categories = [d.date() for d in dates]
+    chart_data.add_series('Close', closes)
+    # Add chart
+    x, y, cx, cy = Inches(1), Inches(2.2), Inches(8), Inches(4)
+    chart = slide.shapes.add_chart(
+        XL_CHART_TYPE.LINE, x, y, cx, cy, chart_data
+    ).chart
+    chart.has_legend = False
+    chart.value_axis.has_major_gridlines = False
+    chart.plots[0].series[0].smooth = False
+    chart.category_axis.tick_labels.number_format = 'mmm yy'
+    chart.category_axis.tick_labels.number_format_is_linked = False
+    chart.category_axis.tick_labels.font.size = Pt(12)
+    chart.category_axis.tick_labels.font.name = FONT_NAME
+    chart.value_axis.tick_labels.font.size = Pt(12)
+    chart.value_axis.tick_labels.font.name = FONT_NAME
+    chart.chart_title.text_frame.text = ""
+
 def add_business_segments_pie_chart_slide(prs, segments, slide_width, slide_height, company_name="Company"):
     slide = prs.slides.add_slide(prs.slide_layouts[6])
     add_modern_background(slide, slide_width, slide_height)
@@ -473,3 +513,4 @@ def add_timeline_slide(prs, events, slide_width, slide_height, company_name="Com
 # Example usage:
 # add_financials_bar_chart_slide(prs, financials_dict, slide_width, slide_height, company_name)
 # add_business_segments_pie_chart_slide(prs, segments_dict, slide_width, slide_height, company_name)
+# add_price_trend_chart_slide(prs, hist.index, hist['Close'], slide_width, slide_height, company_name)
@@ -3,17 +3,21 @@ import logging
 from apscheduler.schedulers.background import BackgroundScheduler
 from datetime import datetime
 import time
-from advanced_crawler import run_advanced_crawler
+from advanced_crawler import run_advanced_crawler, refresh_company_site
 from summarizer import summarize_chunks
 from pdf_exporter import export_summary_to_pdf
 from ppt_exporter import export_summary_to_ppt
 import os
-import requests
+import http_client
+import market_store
+import wikipedia_client
+from website_index import normalize_company_name
 from PyPDF2 import PdfMerger
 from dotenv import load_dotenv
 import feedparser
 from bs4 import BeautifulSoup
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from slack_sdk import WebClient
 from app import fetch_and_summarize_investor_docs
 
@@ -47,6 +51,9 @@ INDIAN_NEWS_SITES = [
 ]
 
 # You can add more global RSS feeds here if desired
+FEED_ENTRIES_PER_SITE = 20
+FEED_FETCH_WORKERS = 8
+FEED_TIMEOUT = 15
 
 logging.basicConfig(level=logging.INFO)
 
@@ -79,16 +86,71 @@ def merge_pdfs(pdf_paths, output_path):
     merger.write(output_path)
     merger.close()
 
-def fetch_company_news(company_name):
+def _fetch_feed(site):
+    resp = http_client.get(site['rss'], timeout=FEED_TIMEOUT)
+    resp.raise_for_status()
+    feed = feedparser.parse(resp.content)
+    return [{
+        "title": entry.get('title', ''),
+        "summary": entry.get('summary', ''),
+        "url": entry.get('link', ''),
+        "source": site['name'],
+    } for entry in feed.entries[:FEED_ENTRIES_PER_SITE]]
+
+def fetch_feed_snapshot(sites=INDIAN_NEWS_SITES):
+    """Fetch and parse every RSS feed once, concurrently; returns all entries as news item dicts."""
+    entries = []
+    with ThreadPoolExecutor(max_workers=FEED_FETCH_WORKERS) as pool:
+        futures = {pool.submit(_fetch_feed, site): site for site in sites}
+        for future in as_completed(futures):
+            site = futures[future]
+            try:
+                items = future.result()
+            except Exception as e:
+                logging.error(f"[RSS] Error for {site['name']}: {e}")
+                continue
+            logging.info(f"[RSS] {len(items)} entries from {site['name']}")
+            entries.extend(items)
+    return entries
+
+def _company_aliases(company_name):
+    return {alias for alias in (company_name.lower().strip(), normalize_company_name(company_name)) if alias}
+
+def match_companies(entries, company_names):
+    """
+    {company name: [entries mentioning it]} in one pass over the entries' titles and summaries.
+    All aliases are compiled into a single case-insensitive alternation (longest first) with word boundaries,
+    so 'TCS' does not match inside 'TCSL' and the cost is linear in the text, not in the number of companies.
+    Overlapping aliases resolve to the longest: 'HDFC Bank shares' counts for HDFC Bank, not HDFC.
+    """
+    companies_by_alias = {}
+    for name in company_names:
+        for alias in _company_aliases(name):
+            companies_by_alias.setdefault(alias, set()).add(name)
+    matched = {name: [] for name in company_names}
+    if not companies_by_alias:
+        return matched
+    aliases = sorted(companies_by_alias, key=len, reverse=True)
+    pattern = re.compile(r"(?<!\w)(?:" + "|".join(re.escape(a) for a in aliases) + r")(?!\w)", re.IGNORECASE)
+    for entry in entries:
+        found = set()
+        for m in pattern.finditer(f"{entry['title']}\n{entry['summary']}"):
+            found |= companies_by_alias[m.group(0).lower()]
+        for name in found:
+            matched[name].append(entry)
+    return matched
+
+def fetch_company_news(company_name, feed_items=None):
     """
     Fetch latest news articles for the company from global and Indian/global news sources.
+    feed_items: this company's entries from match_companies(fetch_feed_snapshot(), ...); fetched here if omitted.
     Returns a list of dicts: [{"title": ..., "summary": ..., "url": ..., "source": ...}, ...]
     """
     news_items = []
     # 1. NewsAPI (global + Indian)
     try:
         url = f'https://newsapi.org/v2/everything?q={company_name}&language=en&sortBy=publishedAt&pageSize=20&apiKey={NEWSAPI_KEY}'
-        resp = requests.get(url)
+        resp = http_client.get(url)
         if resp.status_code == 200:
             data = resp.json()
             all_articles = data.get('articles', [])
@@ -111,27 +173,11 @@ def fetch_company_news(company_name):
                     })
     except Exception as e:
         logging.error(f"[NewsAPI] Error for {company_name}: {e}")
-    # 2. RSS feeds (Indian/global)
-    for site in INDIAN_NEWS_SITES:
-        try:
-            feed = feedparser.parse(site['rss'])
-            logging.info(f"[RSS] {company_name}: {len(feed.entries)} entries from {site['name']}")
-            for entry in feed.entries[:20]:
-                title = entry.title
-                summary = entry.get('summary', '')
-                # Log all fetched titles
-                logging.info(f"[RSS] {company_name} Article: {title}")
-                # Loosened filter: company name anywhere in title or summary
-                if (company_name.lower() in title.lower() or
-                    company_name.lower() in summary.lower()):
-                    news_items.append({
-                        "title": title,
-                        "summary": summary,
-                        "url": entry.link,
-                        "source": site['name']
-                    })
-        except Exception as e:
-            logging.error(f"[RSS] Error for {site['name']} and {company_name}: {e}")
+    # 2. RSS feeds (Indian/global): matched against the shared snapshot instead of refetching every feed
+    if feed_items is None:
+        feed_items = match_companies(fetch_feed_snapshot(), [company_name]).get(company_name, [])
+    logging.info(f"[RSS] {company_name}: {len(feed_items)} matching entries")
+    news_items.extend(feed_items)
     # Deduplicate by title
     seen_titles = set()
     deduped = []
@@ -225,12 +271,24 @@ def summarize_news(news_items, company_name):
 def weekly_job():
     companies = load_companies()
     newsletter_summaries = []
+    # Every feed is fetched once per run and matched against the whole watchlist in one pass
+    feed_matches = match_companies(fetch_feed_snapshot(), [c['name'] for c in companies])
+    # Warm the Wikipedia cache in a few batched calls instead of per-company lookups during the week
+    try:
+        wikipedia_client.prefetch([c['name'] for c in companies])
+    except Exception as e:
+        logging.error(f"[Scheduler] Wikipedia prefetch failed: {e}")
+    # Prices and fundamentals for the whole watchlist in a few batched calls per exchange
+    try:
+        market_store.refresh_watchlist([c['name'] for c in companies])
+    except Exception as e:
+        logging.error(f"[Scheduler] Market data refresh failed: {e}")
     for company in companies:
         name = company['name']
         url = company.get('url')
         logging.info(f"[Scheduler] Processing {name} ({url})")
         try:
-            news_items = fetch_company_news(name)
+            news_items = fetch_company_news(name, feed_items=feed_matches.get(name, []))
             news_summary = summarize_news(news_items, name)
             # Fetch IR document summaries
             ir_docs = fetch_and_summarize_investor_docs(name)
@@ -239,7 +297,16 @@ def weekly_job():
                 for doc in ir_docs:
                     if doc['financials']:
                         ir_section += f"\n[IR] {doc['file']} ({doc['link']}):\n" + '\n'.join([f"{k}: {v}" for k, v in doc['financials'].items()]) + "\n"
-            full_summary = news_summary + ("\n" + ir_section if ir_section else "")
+            # Incremental recrawl of the company site: only new or changed pages are rendered
+            site_section = ""
+            if url:
+                try:
+                    changed = refresh_company_site(url)
+                    if changed:
+                        site_section = "\nWebsite updates this week:\n" + "\n".join(f"- {u}" for u in changed[:10]) + "\n"
+                except Exception as e:
+                    logging.error(f"[Scheduler] Site refresh failed for {name}: {e}")
+            full_summary = news_summary + ("\n" + ir_section if ir_section else "") + site_section
             newsletter_summaries.append({"company": name, "summary": full_summary})
         except Exception as e:
             logging.error(f"[Scheduler] Exception for {name}: {e}")
@@ -0,0 +1,68 @@
+"""
+Benchmark html_extract's lxml fast path against the BeautifulSoup/html.parser code it replaced.
+
+    python scripts/bench_html_extract.py                                  (the saved pages in scripts/bench_pages)
+    python scripts/bench_html_extract.py saved_pages/*.html
+    python scripts/bench_html_extract.py https://www.infosys.com/about.html      (fetched once, then timed)
+
+For every page and extraction it reports whether both paths produce identical output and the speedup.
+bench_pages holds real generated documentation pages with sidebars, navigation and large tables (Python's
+Sphinx IDLE help, rustc's mdBook platform-support table, npm's package.json docs); save company pages
+next to them (curl -o scripts/bench_pages/<name>.html <url>) to benchmark on the sites the crawler visits.
+"""
+import os
+import sys
+import glob
+import time
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import http_client  # noqa: E402
+import html_extract  # noqa: E402
+
+BENCH_PAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_pages')
+
+EXTRACTIONS = [
+    ('main_text', (5000,)),
+    ('paragraph_text', ()),
+    ('all_text', ()),
+    ('element_texts', (('p', 'li', 'div', 'span', 'h2', 'h3', 'h4'),)),
+    ('text_blocks', ()),
+    ('links', (None,)),
+    ('infobox_rows', ()),
+]
+
+def _time(fn, html, args, repeat):
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(html, *args)
+        runs.append(time.perf_counter() - start)
+    return result, statistics.median(runs)
+
+def load(source):
+    if source.startswith(('http://', 'https://')):
+        return http_client.get(source, timeout=15).text
+    with open(source, encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+def main(sources, repeat=5):
+    if not html_extract.HAVE_LXML:
+        sys.exit("lxml is not installed; nothing to compare")
+    totals = {'fast': 0.0, 'slow': 0.0}
+    for source in sources:
+        html = load(source)
+        print(f"\n{source} ({len(html) / 1024:.0f} KB)")
+        for name, args in EXTRACTIONS:
+            fast, slow = html_extract._IMPLEMENTATIONS[name]
+            fast_out, fast_t = _time(fast, html, args, repeat)
+            slow_out, slow_t = _time(slow, html, args, repeat)
+            totals['fast'] += fast_t
+            totals['slow'] += slow_t
+            same = 'same output' if fast_out == slow_out else 'OUTPUT DIFFERS'
+            print(f"  {name:15s} bs4 {slow_t * 1000:8.1f} ms   lxml {fast_t * 1000:7.1f} ms   {slow_t / fast_t:5.1f}x   {same}")
+    if totals['fast']:
+        print(f"\nOverall: {totals['slow'] / totals['fast']:.1f}x faster")
+
+if __name__ == '__main__':
+    main(sys.argv[1:] or sorted(glob.glob(os.path.join(BENCH_PAGES, '*.html'))))
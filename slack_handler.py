@@ -1,8 +1,9 @@
 import os
-import requests
+import http_client
 from flask import Flask, request, jsonify
 from crawler import fetch_text_from_url, extract_ir_links
 from pdf_parser import extract_text_from_pdf
+from ir_downloader import iter_downloads
 from summarizer import init_gemini, summarize_chunks
 from pdf_exporter import export_summary_to_pdf
 from ppt_exporter import export_summary_to_ppt
@@ -24,7 +25,7 @@ def send_message_to_slack(channel_id, message):
         "channel": channel_id,
         "text": message
     }
-    requests.post("https://slack.com/api/chat.postMessage", headers=headers, json=payload)
+    http_client.post("https://slack.com/api/chat.postMessage", headers=headers, json=payload)
 
 @app.route("/slack/events", methods=["POST"])
 def handle_slack_event():
@@ -42,17 +43,11 @@ def handle_slack_event():
         ir_links = extract_ir_links(text)
 
         pdf_texts = ""
-        for link in ir_links:
-            if link.endswith(".pdf"):
-                try:
-                    filename = link.split("/")[-1]
-                    r = requests.get(link, timeout=10)
-                    filepath = os.path.join("downloads", filename)
-                    with open(filepath, 'wb') as f:
-                        f.write(r.content)
-                    pdf_texts += extract_text_from_pdf(filepath)
-                except:
-                    continue
+        for doc in iter_downloads([link for link in ir_links if link.endswith(".pdf")]):
+            try:
+                pdf_texts += extract_text_from_pdf(doc['path'], max_chars=12000)
+            except:
+                continue
 
         full_context = (main_text + "\n" + pdf_texts)[:12000]
         raw_summary = summarize_chunks(full_context)
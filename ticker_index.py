@@ -0,0 +1,190 @@
+import os
+import re
+import csv
+import mmap
+import struct
+import logging
+import threading
+from collections import namedtuple
+from disk_cache import CACHE_DIR
+
+# --- CONFIG ---
+UNIVERSE_CSV = os.getenv('TICKER_UNIVERSE_CSV', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ticker_universe.csv'))
+INDEX_PATH = os.path.join(CACHE_DIR, 'ticker_index.bin')
+MAX_NGRAM = 6  # longest alias, in words, matched inside a free-text query
+MAGIC = b'TKIX0001'
+HEADER = struct.Struct('<8sI')  # magic, record count
+OFFSET = struct.Struct('<I')
+# Exchange recorded for hand-maintained map entries, by symbol suffix; unsuffixed symbols are US listings
+SUFFIX_EXCHANGES = {'.NS': 'NSE', '.BO': 'BSE'}
+
+Listing = namedtuple('Listing', 'symbol exchange')
+Match = namedtuple('Match', 'alias symbol exchange')
+# Exchange listing exports import_listings understands: header column -> (symbol column, name column, suffix, exchange)
+LISTING_FORMATS = {
+    'NAME OF COMPANY': ('SYMBOL', 'NAME OF COMPANY', '.NS', 'NSE'),  # NSE EQUITY_L.csv
+    'Issuer Name': ('Security Id', 'Issuer Name', '.BO', 'BSE'),  # BSE "List of Scrips" export
+    'Security Name': (None, 'Security Name', '', 'US'),  # Nasdaq Trader nasdaqlisted.txt / otherlisted.txt
+}
+# Share-class wording after the issuer in US security names: 'ON Semiconductor Corporation Common Stock'
+SECURITY_CLASS = re.compile(r"\s+(?:-\s+)?(?:class [a-z]\b|common stock|common shares|ordinary shares|american depositary|"
+                            r"depositary shares|shares of beneficial interest|units\b|warrants?\b).*$", re.IGNORECASE)
+
+_index = None
+_index_lock = threading.Lock()
+
+def normalize_alias(text):
+    """'  Coca-Cola  Company ' -> 'coca-cola company': lower case, single spaces, no tabs/newlines."""
+    return " ".join((text or "").lower().split())
+
+def _tokens(text):
+    return [t for t in (w.strip(".,;:()[]'\"") for w in normalize_alias(text).split()) if t]
+
+def build_index(csv_path=UNIVERSE_CSV, index_path=INDEX_PATH, extra=None):
+    """
+    Write the sorted, memory-mappable index for the alias,symbol,exchange rows of csv_path.
+    extra {alias: symbol} entries (the hand-maintained map) override CSV rows with the same alias.
+    Layout: header, one uint32 offset per record, then 'alias\\tsymbol\\texchange\\n' records sorted by alias bytes.
+    """
+    rows = {}
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            alias = normalize_alias(row.get('alias'))
+            symbol = (row.get('symbol') or '').strip()
+            if alias and symbol:
+                rows[alias.encode('utf-8')] = (symbol, (row.get('exchange') or '').strip())
+    for alias, symbol in (extra or {}).items():
+        alias = normalize_alias(alias)
+        if alias:
+            previous = rows.get(alias.encode('utf-8'), ('', ''))
+            suffix_exchange = next((ex for suffix, ex in SUFFIX_EXCHANGES.items() if symbol.upper().endswith(suffix)), 'US')
+            rows[alias.encode('utf-8')] = (symbol, previous[1] if previous[0] == symbol else suffix_exchange)
+    records, offsets, position = [], [], 0
+    for alias in sorted(rows):
+        symbol, exchange = rows[alias]
+        record = alias + b'\t' + f"{symbol}\t{exchange}\n".encode('utf-8')
+        offsets.append(position)
+        records.append(record)
+        position += len(record)
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(records)))
+        f.write(b''.join(OFFSET.pack(o) for o in offsets))
+        f.write(b''.join(records))
+    os.replace(tmp_path, index_path)  # readers never see a half-written index
+    logging.info(f"[ticker_index] Indexed {len(records)} aliases from {csv_path}")
+    return index_path
+
+def _listing_rows(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        sample = f.readline()
+        f.seek(0)
+        reader = csv.DictReader(f, delimiter='|' if '|' in sample else ',')
+        reader.fieldnames = [name.strip() for name in reader.fieldnames or []]
+        fmt = next((LISTING_FORMATS[col] for col in LISTING_FORMATS if col in reader.fieldnames), None)
+        if fmt is None:
+            raise ValueError(f"{path}: not an NSE, BSE or Nasdaq Trader listing file")
+        symbol_col, name_col, suffix, exchange = fmt
+        if symbol_col is None:
+            symbol_col = 'Symbol' if 'Symbol' in reader.fieldnames else 'ACT Symbol'
+        for row in reader:
+            symbol = (row.get(symbol_col) or '').strip()
+            # Nasdaq Trader files end with a 'File Creation Time' row and flag test issues and ETFs
+            if not symbol or row.get('Test Issue') == 'Y' or row.get('ETF') == 'Y' or symbol.startswith('File Creation'):
+                continue
+            name = SECURITY_CLASS.sub('', row.get(name_col) or '')
+            yield name, symbol + suffix, exchange
+
+def import_listings(paths, csv_path=UNIVERSE_CSV):
+    """
+    Write csv_path (alias,symbol,exchange) from exchange listing exports: NSE EQUITY_L.csv, BSE's list of
+    scrips, Nasdaq Trader nasdaqlisted.txt / otherlisted.txt. Aliases are normalized company names
+    ('Infosys Limited' -> 'infosys'); symbols are not used as aliases, since short ones ('ON', 'A') are
+    ordinary words. The first file listing an alias wins. Returns the number of rows written.
+    """
+    from website_index import normalize_company_name
+    rows = {}
+    for path in paths:
+        for name, symbol, exchange in _listing_rows(path):
+            alias = normalize_company_name(name)
+            if alias:
+                rows.setdefault(alias, (symbol, exchange))
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['alias', 'symbol', 'exchange'])
+        writer.writerows([alias, symbol, exchange] for alias, (symbol, exchange) in sorted(rows.items()))
+    logging.info(f"[ticker_index] Wrote {len(rows)} aliases to {csv_path}")
+    return len(rows)
+
+class TickerIndex:
+    """Read-only view of a built index; lookups binary-search the memory-mapped file without loading it."""
+
+    def __init__(self, path=INDEX_PATH):
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a ticker index")
+        self._records_start = HEADER.size + self.count * OFFSET.size
+
+    def _alias_at(self, i):
+        start = self._records_start + OFFSET.unpack_from(self._mm, HEADER.size + i * OFFSET.size)[0]
+        return start, self._mm[start:self._mm.find(b'\t', start)]
+
+    def get(self, alias):
+        """Listing(symbol, exchange) for an exact alias, or None."""
+        key = normalize_alias(alias).encode('utf-8')
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start, found = self._alias_at(mid)
+            if found < key:
+                lo = mid + 1
+            elif found > key:
+                hi = mid
+            else:
+                fields = self._mm[start:self._mm.find(b'\n', start)].decode('utf-8').split('\t')
+                return Listing(fields[1], fields[2] or None)
+        return None
+
+    def find_in(self, text):
+        """Longest alias (in words) occurring as whole words in text, leftmost first: Match(alias, symbol, exchange) or None."""
+        words = _tokens(text)
+        for n in range(min(MAX_NGRAM, len(words)), 0, -1):
+            for i in range(len(words) - n + 1):
+                alias = " ".join(words[i:i + n])
+                hit = self.get(alias)
+                if hit:
+                    return Match(alias, *hit)
+        return None
+
+def _stale(index_path, sources):
+    if not os.path.exists(index_path):
+        return True
+    built = os.path.getmtime(index_path)
+    return any(os.path.exists(s) and os.path.getmtime(s) > built for s in sources)
+
+def get_index():
+    """The shared TickerIndex, rebuilt first if the CSV or the hand-maintained map changed since it was built."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                import company_ticker_map
+                if _stale(INDEX_PATH, [UNIVERSE_CSV, company_ticker_map.__file__]):
+                    build_index(extra=company_ticker_map.COMPANY_TICKER_MAP)
+                _index = TickerIndex(INDEX_PATH)
+    return _index
+
+if __name__ == '__main__':
+    # python ticker_index.py [universe.csv]  -- rebuild the index, e.g. after replacing the bundled CSV
+    # python ticker_index.py --import EQUITY_L.csv nasdaqlisted.txt otherlisted.txt  -- regenerate the CSV first
+    import sys
+    import company_ticker_map
+    logging.basicConfig(level=logging.INFO)
+    args = sys.argv[1:]
+    if args[:1] == ['--import']:
+        import_listings(args[1:])
+        args = []
+    build_index(args[0] if args else UNIVERSE_CSV, extra=company_ticker_map.COMPANY_TICKER_MAP)
@@ -0,0 +1,97 @@
+import os
+import logging
+import threading
+from concurrent.futures import Future
+import http_client
+from disk_cache import DiskCache
+from company_ticker_map import get_ticker
+from website_index import normalize_company_name
+
+# --- CONFIG ---
+YAHOO_SEARCH_URL = 'https://query2.finance.yahoo.com/v1/finance/search'
+RESOLVED_TTL = int(os.getenv('TICKER_RESOLVED_TTL', 90 * 86400))
+NEGATIVE_TTL = int(os.getenv('TICKER_NEGATIVE_TTL', 86400))  # names Yahoo had no quote for
+# Yahoo exchange codes for symbol suffixes, used for static map entries
+SUFFIX_EXCHANGES = {'.NS': 'NSI', '.BO': 'BSE', '.L': 'LSE', '.TO': 'TOR', '.T': 'JPX', '.HK': 'HKG', '.DE': 'GER'}
+
+_cache = None
+_inflight = {}
+_lock = threading.Lock()
+
+def _get_cache():
+    global _cache
+    if _cache is None:
+        _cache = DiskCache('tickers')
+    return _cache
+
+def _exchange_for(symbol):
+    return next((ex for suffix, ex in SUFFIX_EXCHANGES.items() if symbol.upper().endswith(suffix)), None)
+
+def _search_yahoo(company_name):
+    """Best Yahoo Finance search hit as {'symbol', 'exchange', 'exchange_name', 'name', 'quote_type'}, or None."""
+    resp = http_client.get(YAHOO_SEARCH_URL, params={'q': company_name}, timeout=10, cache=True)
+    quotes = [q for q in resp.json().get('quotes', []) if q.get('symbol')]
+    if not quotes:
+        return None
+    # Prefer a listed equity over funds, futures and the like
+    quote = next((q for q in quotes if q.get('quoteType') == 'EQUITY'), quotes[0])
+    return {
+        'symbol': quote['symbol'],
+        'exchange': quote.get('exchange'),
+        'exchange_name': quote.get('exchDisp'),
+        'name': quote.get('longname') or quote.get('shortname'),
+        'quote_type': quote.get('quoteType'),
+    }
+
+def lookup(company_name):
+    """Resolution from the static map or the learned cache without any network call; {} for a cached miss, None if unknown."""
+    symbol = get_ticker(company_name)
+    if symbol:
+        return {'symbol': symbol, 'exchange': _exchange_for(symbol), 'source': 'map'}
+    return _get_cache().get_json(normalize_company_name(company_name))
+
+def resolve_info(company_name):
+    """
+    Ticker for a company as {'symbol', 'exchange', 'exchange_name', 'name', 'quote_type', 'source'}, or None.
+    Order: static COMPANY_TICKER_MAP, then the persistent learned cache, then one Yahoo search whose answer
+    (or miss) is cached. Concurrent lookups for the same name share a single search.
+    """
+    if not company_name or not company_name.strip():
+        return None
+    cached = lookup(company_name)
+    if cached is not None:
+        return cached or None
+    key = normalize_company_name(company_name)
+    with _lock:
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = _inflight[key] = Future()
+    if not owner:
+        return future.result()
+    try:
+        info = _search_yahoo(company_name)
+        if info:
+            info['source'] = 'yahoo'
+            _get_cache().set_json(key, info, ttl=RESOLVED_TTL)
+        else:
+            _get_cache().set_json(key, {}, ttl=NEGATIVE_TTL)
+        logging.info(f"[ticker_resolver] {company_name} -> {info['symbol'] if info else 'no ticker'}")
+        future.set_result(info)
+        return info
+    except Exception as e:
+        # Network failures are not cached; the next call searches again
+        future.set_exception(e)
+        raise
+    finally:
+        with _lock:
+            _inflight.pop(key, None)
+
+def resolve(company_name):
+    """Ticker symbol for a company, or None (lookup errors included)."""
+    try:
+        info = resolve_info(company_name)
+    except Exception as e:
+        logging.warning(f"[ticker_resolver] Lookup failed for {company_name}: {e}")
+        return None
+    return info['symbol'] if info else None
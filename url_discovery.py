@@ -0,0 +1,136 @@
+import os
+import zlib
+import logging
+import threading
+import xml.etree.ElementTree as ET
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+import http_client
+import politeness
+
+# --- CONFIG ---
+SITEMAP_MAX_URLS = int(os.getenv('SITEMAP_MAX_URLS', 5000))  # candidate URLs collected per site
+SITEMAP_MAX_FILES = 25  # sitemap documents fetched per site, nested indexes included
+SITEMAP_MAX_BYTES = 50 * 1024 * 1024  # the sitemaps.org limit for one uncompressed sitemap
+MAX_CRAWL_DELAY = 10  # seconds; longer robots.txt delays are capped rather than stalling the crawl
+ROBOTS_AGENT = 'ClientPrepAgent'
+FALLBACK_SITEMAPS = ('/sitemap.xml', '/sitemap_index.xml')
+GZIP_MAGIC = b'\x1f\x8b'
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+_robots = {}
+_robots_lock = threading.Lock()
+
+def _origin(url):
+    parsed = urlparse(url if '://' in url else f'https://{url}')
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+class SiteRules:
+    """robots.txt of one origin: can_fetch(url), crawl_delay (seconds, capped) and the sitemaps it lists."""
+
+    def __init__(self, origin, parser=None):
+        self.origin = origin
+        self.parser = parser
+        delay = parser.crawl_delay(ROBOTS_AGENT) if parser else None
+        self.crawl_delay = min(float(delay), MAX_CRAWL_DELAY) if delay else 0.0
+        self.sitemaps = list(parser.site_maps() or []) if parser else []
+        politeness.set_crawl_delay(origin, self.crawl_delay)
+
+    def can_fetch(self, url):
+        return self.parser is None or self.parser.can_fetch(ROBOTS_AGENT, url)
+
+def get_site_rules(url):
+    """Parsed robots.txt for the origin of url, fetched once per process (the response cache covers restarts)."""
+    origin = _origin(url)
+    with _robots_lock:
+        if origin in _robots:
+            return _robots[origin]
+    parser = None
+    try:
+        resp = http_client.get(f"{origin}/robots.txt", timeout=10, cache=True)
+        if resp.status_code == 200:
+            parser = RobotFileParser()
+            parser.parse(resp.text.splitlines())
+        elif resp.status_code in (401, 403):
+            # Same reading as urllib.robotparser: an access-restricted robots.txt disallows everything
+            parser = RobotFileParser()
+            parser.disallow_all = True
+    except Exception as e:
+        logging.info(f"[url_discovery] No robots.txt for {origin}: {e}")
+    rules = SiteRules(origin, parser)
+    with _robots_lock:
+        _robots[origin] = rules
+    return rules
+
+def _sitemap_chunks(url):
+    """Body of a sitemap as decompressed byte chunks; .gz sitemaps are recognised by their magic bytes."""
+    with http_client.stream('GET', url, timeout=20) as resp:
+        if resp.status_code != 200:
+            return
+        inflater = None
+        size = 0
+        for chunk in resp.iter_bytes():
+            if inflater is None:
+                inflater = zlib.decompressobj(16 + zlib.MAX_WBITS) if chunk[:2] == GZIP_MAGIC else False
+            data = inflater.decompress(chunk) if inflater else chunk
+            size += len(data)
+            if size > SITEMAP_MAX_BYTES:
+                logging.info(f"[url_discovery] {url} exceeds {SITEMAP_MAX_BYTES} bytes; truncated")
+                return
+            yield data
+
+def iter_sitemap(url):
+    """
+    Stream-parse one sitemap document. Yields ('url', loc, lastmod) for page entries and
+    ('sitemap', loc, lastmod) for nested sitemaps of an index; lastmod is '' when absent.
+    Elements are cleared as they are consumed, so memory stays flat on large sitemaps.
+    """
+    parser = ET.XMLPullParser(events=('end',))
+    entry = {}
+    for data in _sitemap_chunks(url):
+        parser.feed(data)
+        for _, elem in parser.read_events():
+            ns, _, tag = elem.tag[1:].rpartition('}') if elem.tag.startswith('{') else ('', '', elem.tag)
+            if ns not in ('', SITEMAP_NS):
+                continue  # image:loc, video:*, xhtml:link extensions inside <url>
+            if tag in ('loc', 'lastmod'):
+                entry[tag] = (elem.text or '').strip()
+            elif tag in ('url', 'sitemap'):
+                if entry.get('loc'):
+                    yield tag, entry['loc'], entry.get('lastmod', '')
+                entry = {}
+                elem.clear()
+
+def discover_urls(base_url, max_urls=SITEMAP_MAX_URLS):
+    """
+    Candidate URLs for a site from robots.txt and its (nested, possibly gzipped) sitemaps, without rendering
+    any page. Returns {url: lastmod}, robots-disallowed URLs excluded; lastmod is '' when the sitemap has none.
+    Sitemap fetches are spaced by the site's crawl-delay (applied through the politeness scheduler).
+    """
+    rules = get_site_rules(base_url)
+    fallbacks = [rules.origin + path for path in FALLBACK_SITEMAPS]
+    pending = rules.sitemaps or list(fallbacks)
+    fetched = set()
+    entries = {}
+    while pending and len(entries) < max_urls and len(fetched) < SITEMAP_MAX_FILES:
+        sitemap_url = pending.pop(0)
+        if sitemap_url in fetched:
+            continue
+        fetched.add(sitemap_url)
+        found = False
+        try:
+            for kind, loc, lastmod in iter_sitemap(sitemap_url):
+                found = True
+                if kind == 'sitemap':
+                    pending.append(loc)
+                elif rules.can_fetch(loc):
+                    entries[loc] = lastmod
+                    if len(entries) >= max_urls:
+                        break
+        except Exception as e:
+            logging.info(f"[url_discovery] Could not read sitemap {sitemap_url}: {e}")
+        if found and sitemap_url in fallbacks:
+            # The first conventional location that exists is the site's sitemap
+            pending = [p for p in pending if p not in fallbacks]
+    logging.info(f"[url_discovery] {rules.origin}: {len(entries)} URLs from {len(fetched)} sitemaps")
+    return entries
@@ -0,0 +1,92 @@
+import os
+import re
+import json
+import threading
+import logging
+from concurrent.futures import Future
+from disk_cache import DiskCache
+
+# --- CONFIG ---
+RESOLUTION_TTL = int(os.getenv('WEBSITE_RESOLUTION_TTL', 30 * 86400))
+NEGATIVE_TTL = int(os.getenv('WEBSITE_NEGATIVE_TTL', 3600))  # names that did not resolve
+COMPANIES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'companies.json')
+NAME_SUFFIXES = {'ltd', 'limited', 'inc', 'incorporated', 'corp', 'corporation', 'plc', 'llc', 'co', 'company', 'pvt', 'private'}
+
+_index = None
+_seeds = None
+_inflight = {}
+_lock = threading.Lock()
+
+def normalize_company_name(name):
+    """'Infosys Ltd.' / ' INFOSYS ' -> 'infosys'"""
+    words = re.sub(r"[^a-z0-9&]+", " ", (name or "").lower()).split()
+    while len(words) > 1 and words[-1] in NAME_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+def _get_index():
+    global _index
+    if _index is None:
+        _index = DiskCache('company_websites')
+    return _index
+
+def _load_seeds():
+    """Known name -> website pairs from companies.json and the domain entries of COMPANY_TICKER_MAP."""
+    from company_ticker_map import COMPANY_TICKER_MAP
+    seeds = {}
+    # Names and domains that share a ticker in the map belong to the same company
+    domains_by_ticker = {}
+    for key, ticker in COMPANY_TICKER_MAP.items():
+        if '.' in key and ' ' not in key:
+            domains_by_ticker.setdefault(ticker, []).append(key)
+    for key, ticker in COMPANY_TICKER_MAP.items():
+        domains = domains_by_ticker.get(ticker, [])
+        if key not in domains and len(domains) == 1:
+            seeds[normalize_company_name(key)] = f"https://www.{domains[0]}"
+    try:
+        with open(COMPANIES_FILE) as f:
+            for company in json.load(f):
+                if company.get('url'):
+                    seeds[normalize_company_name(company['name'])] = company['url']
+    except (OSError, ValueError) as e:
+        logging.warning(f"[website_index] Could not read {COMPANIES_FILE}: {e}")
+    return seeds
+
+def lookup(company_name):
+    """Website for a company from the seeds or the persistent index; '' for a cached miss, None if unknown."""
+    global _seeds
+    if _seeds is None:
+        _seeds = _load_seeds()
+    key = normalize_company_name(company_name)
+    if key in _seeds:
+        return _seeds[key]
+    hit = _get_index().get_json(key)
+    return hit['url'] if hit else None
+
+def resolve(company_name, resolver):
+    """
+    Resolve a company name to its website through the index, calling resolver(company_name) only on a miss.
+    Concurrent lookups for the same name share a single resolver call.
+    """
+    cached = lookup(company_name)
+    if cached is not None:
+        return cached or None
+    key = normalize_company_name(company_name)
+    with _lock:
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = _inflight[key] = Future()
+    if not owner:
+        return future.result()
+    try:
+        url = resolver(company_name)
+        _get_index().set_json(key, {'url': url or ''}, ttl=RESOLUTION_TTL if url else NEGATIVE_TTL)
+        future.set_result(url)
+        return url
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _lock:
+            _inflight.pop(key, None)
@@ -0,0 +1,155 @@
+import os
+import time
+import logging
+import http_client
+import html_extract
+from disk_cache import DiskCache
+from website_index import normalize_company_name
+
+# --- CONFIG ---
+WIKI_API = "https://en.wikipedia.org/w/api.php"
+TITLE_TTL = int(os.getenv('WIKI_TITLE_TTL', 30 * 86400))  # company name -> article title
+TITLE_NEGATIVE_TTL = int(os.getenv('WIKI_TITLE_NEGATIVE_TTL', 86400))  # names with no article
+REVALIDATE_AFTER = int(os.getenv('WIKI_REVALIDATE_AFTER', 86400))  # cached pages older than this are checked against the live revid
+BATCH_SIZE = 20  # titles per query; the extracts prop returns at most 20 intros per call
+LEADERSHIP_HEADERS = ['key people', 'ceo', 'chairman', 'founder', 'president', 'cfo', 'cto', 'coo']
+
+_cache = None
+
+def _get_cache():
+    global _cache
+    if _cache is None:
+        _cache = DiskCache('wikipedia')
+    return _cache
+
+def _api(params, cache=False):
+    params = {"format": "json", "formatversion": 2, **params}
+    resp = http_client.get(WIKI_API, params=params, timeout=10, cache=cache)
+    resp.raise_for_status()
+    return resp.json()
+
+def resolve_title(company_name):
+    """Article title for a company (first search hit), cached per normalized name; None if there is none."""
+    key = f"title:{normalize_company_name(company_name)}"
+    hit = _get_cache().get_json(key)
+    if hit is not None:
+        return hit['title'] or None
+    results = _api({"action": "query", "list": "search", "srsearch": company_name, "srlimit": 1}, cache=True)
+    hits = results.get("query", {}).get("search", [])
+    title = hits[0]["title"] if hits else None
+    _get_cache().set_json(key, {'title': title or ''}, ttl=TITLE_TTL if title else TITLE_NEGATIVE_TTL)
+    return title
+
+def _query_pages(titles):
+    """
+    One batched query for intro extract and latest revision of up to BATCH_SIZE titles.
+    Returns {requested title: {'title', 'revid', 'summary'}}; missing pages are left out.
+    """
+    data = _api({
+        "action": "query", "prop": "extracts|info", "exintro": 1, "explaintext": 1, "exlimit": "max",
+        "redirects": 1, "titles": "|".join(titles),
+    })
+    query = data.get("query", {})
+    # Requested titles may be normalized ('tata steel' -> 'Tata steel') and then redirected
+    renamed = {}
+    for step in query.get("normalized", []) + query.get("redirects", []):
+        renamed[step["from"]] = step["to"]
+    pages = {p["title"]: p for p in query.get("pages", []) if not p.get("missing") and not p.get("invalid")}
+    found = {}
+    for title in titles:
+        final = title
+        while final in renamed and final not in pages:
+            final = renamed[final]
+        page = pages.get(final)
+        if page:
+            found[title] = {'title': page["title"], 'revid': page.get("lastrevid"), 'summary': page.get("extract", "")}
+    return found
+
+def _leadership_from_infobox(html):
+    leadership = []
+    for header, cell_strings in html_extract.infobox_rows(html):
+        if any(x in header.lower() for x in LEADERSHIP_HEADERS):
+            for part in cell_strings:
+                # Try to split role and name
+                if ':' in part:
+                    role, name = part.split(':', 1)
+                    leadership.append({"name": name.strip(), "role": role.strip()})
+                elif '-' in part:
+                    role, name = part.split('-', 1)
+                    leadership.append({"name": name.strip(), "role": role.strip()})
+                else:
+                    leadership.append({"name": part.strip(), "role": header.strip()})
+    return leadership
+
+def _infobox_leadership(revid):
+    # The infobox lives in the lead section; a fixed revision never changes, so the response cache can keep it
+    data = _api({"action": "parse", "oldid": revid, "prop": "text", "section": 0}, cache=True)
+    return _leadership_from_infobox(data.get("parse", {}).get("text", ""))
+
+def _refresh(titles):
+    """Bring the cached entries for titles up to date: one batched query per BATCH_SIZE, a parse call per changed page."""
+    now = time.time()
+    for i in range(0, len(titles), BATCH_SIZE):
+        batch = titles[i:i + BATCH_SIZE]
+        live = _query_pages(batch)
+        for title in batch:
+            key = f"page:{title}"
+            page = live.get(title)
+            if page is None:
+                _get_cache().delete(key)
+                continue
+            cached = _get_cache().get_json(key)
+            if cached and cached.get('revid') == page['revid']:
+                cached['checked_at'] = now
+                _get_cache().set_json(key, cached)
+                continue
+            try:
+                page['leadership'] = _infobox_leadership(page['revid']) if page['revid'] else []
+            except Exception as e:
+                logging.info(f"[wikipedia_client] Infobox fetch failed for {title}: {e}")
+                page['leadership'] = []
+            page['checked_at'] = now
+            _get_cache().set_json(key, page)
+            logging.info(f"[wikipedia_client] Cached {title} at revision {page['revid']}")
+
+def get_page(company_name):
+    """
+    {'title', 'revid', 'summary', 'leadership'} for a company's article, or None. Served from the per-title
+    cache; an entry is revalidated against the article's latest revision after REVALIDATE_AFTER seconds and
+    refetched only if the revision changed.
+    """
+    title = resolve_title(company_name)
+    if not title:
+        return None
+    key = f"page:{title}"
+    cached = _get_cache().get_json(key)
+    if cached is None or time.time() - cached.get('checked_at', 0) > REVALIDATE_AFTER:
+        _refresh([title])
+        cached = _get_cache().get_json(key)
+    return cached
+
+def summary(company_name):
+    page = get_page(company_name)
+    return page['summary'] if page else ""
+
+def leadership(company_name):
+    page = get_page(company_name)
+    return page['leadership'] if page else []
+
+def prefetch(company_names):
+    """Warm the cache for many companies: titles are resolved once, then stale pages are checked in batches."""
+    titles = []
+    for name in company_names:
+        try:
+            title = resolve_title(name)
+        except Exception as e:
+            logging.warning(f"[wikipedia_client] Title lookup failed for {name}: {e}")
+            continue
+        if title and title not in titles:
+            titles.append(title)
+    now = time.time()
+    stale = [t for t in titles if now - (_get_cache().get_json(f"page:{t}") or {}).get('checked_at', 0) > REVALIDATE_AFTER]
+    if stale:
+        _refresh(stale)
+    logging.info(f"[wikipedia_client] Prefetched {len(titles)} articles ({len(stale)} checked for new revisions)")
+    return titles